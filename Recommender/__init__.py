@@ -87,7 +87,7 @@ class RecommendationAPI(Flask):
                 'status': self.mode if self.mode != 'deploy' else 'healthy',
             })
 
-    def run(self, host: str = None, port: int = None, mode: str = 'deploy', load_dotenv: bool = True, sync: bool = False, **options) -> None:
+    def run(self, host: str = None, port: int = None, mode: str = 'deploy', load_dotenv: bool = True, sync: bool = False, refresh_embeddings: bool = False, **options) -> None:
         """
         Run the RecommendationAPI server with specified host, port, and mode settings.
 
@@ -96,6 +96,9 @@ class RecommendationAPI(Flask):
             port (int): The port on which the server will listen. Defaults to None.
             mode (str): The mode in which to run the server, one of 'deploy', 'debug', or 'maintenance'.
             load_dotenv (bool): If True, loads environment variables from .env. Defaults to True.
+            sync (bool): If True, synchronizes Neo4j with MongoDB before starting. Defaults to False.
+            refresh_embeddings (bool): If True, computes every missing or expired embedding before starting.
+                Defaults to False.
             **options: Additional keyword arguments passed to Flask's run method.
 
         Raises:
@@ -115,4 +118,13 @@ class RecommendationAPI(Flask):
         if sync:
             self.db.sync.sync_all(erase_data=True)
 
+        # Embeddings are computed here and by a background job, never by the recommendation requests.
+        # The job is started now rather than on the first EM request (see `EM_engine._get_table`).
+        from .api import em_recommender
+        if refresh_embeddings:
+            em_recommender.embedder.refresh_embeddings()
+        if self.config.get('EMBEDDING_REFRESH_MINUTES', 60) > 0:
+            em_recommender.embedder.start_refresh(self.config['EMBEDDING_REFRESH_MINUTES'],
+                                                  refresh_now=not refresh_embeddings)
+
         return super().run(host=host, port=port, debug=mode.lower() in 'debug', load_dotenv=load_dotenv, **options)
@@ -12,6 +12,8 @@ Functions:
     main(host: str, port: int, mode: str): Initializes and runs the RecommendationAPI with the specified settings.
 
 Command-line Arguments:
+    --sync: If set, Neo4j is synchronized with MongoDB at startup.
+    --refresh-embeddings: If set, every missing or expired embedding is computed at startup.
     --maintenance: If set, the application runs in maintenance mode.
     --debug: If set, the application runs in debug mode.
     --host: Host IP address on which the application runs. Defaults to '0.0.0.0'.
@@ -23,7 +25,7 @@ import argparse
 import sys
 
 # =================================== Main ===================================
-def main(host: str = '0.0.0.0', port: int = 8080, mode: str = 'deploy', sync: bool = False) -> None:
+def main(host: str = '0.0.0.0', port: int = 8080, mode: str = 'deploy', sync: bool = False, refresh_embeddings: bool = False) -> None:
     """
     Initializes and runs the RecommendationAPI application.
 
@@ -35,6 +37,7 @@ def main(host: str = '0.0.0.0', port: int = 8080, mode: str = 'deploy', sync: bo
             - 'debug': Enables debugging features for development.
             - 'maintenance': Enables maintenance mode, limiting functionality.
         sync (bool): Enable the synchronization between neo4j and mogoDB at starting
+        refresh_embeddings (bool): Compute every missing or expired embedding at starting
 
     Returns:
         None
@@ -43,12 +46,13 @@ def main(host: str = '0.0.0.0', port: int = 8080, mode: str = 'deploy', sync: bo
                             static_url_path='',
                             static_folder='assets',
                             template_folder='templates')
-    app.run(mode=mode, host=host, port=port, sync=sync)
+    app.run(mode=mode, host=host, port=port, sync=sync, refresh_embeddings=refresh_embeddings)
 
 # =================================== Run ===================================
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Python script")
     parser.add_argument('--sync', action='store_true', help='Synchronize neo4j with mogoDB database')
+    parser.add_argument('--refresh-embeddings', action='store_true', help='Compute missing or expired embeddings')
     parser.add_argument('--maintenance', action='store_true', help='Maintenance mode')
     parser.add_argument('--debug', action='store_true', help='Debug mode')
     parser.add_argument('--host', type=str, default='0.0.0.0', help='Host')
@@ -61,7 +65,8 @@ if __name__ == '__main__':
         main(mode='debug' if args.debug else 'maintenance' if args.maintenance else 'deploy',
              host=args.host,
              port=args.port,
-             sync=args.sync)
+             sync=args.sync,
+             refresh_embeddings=args.refresh_embeddings)
         rc = 0
     except Exception as e:
         print('Error: %s' % e, file=sys.stderr)
@@ -16,6 +16,7 @@ Blueprint:
 
 Routes:
     - /recommend/users (GET): Recommends user profiles to a given user based on mutual connections and shared interests.
+    - /recommend/EM/users/batch (GET): Recommends user profiles to several users at once based on their embeddings.
     - /recommend/posts (GET): Recommends posts to a given user based on interests and interactions.
     - /recommend/threads (GET): Recommends threads for a given user based on shared memberships and interests.
 """
@@ -171,6 +172,36 @@ def recommend_users():
         logger.error(f"Error in recommend_users: {e}")
         return jsonify({"error": str(e)}), 500
 
+@em_recommendation_bp.route('/users/batch', methods=['GET'])
+@jwt_required(not Config.NO_AUTH)
+def recommend_users_batch():
+    """
+    Recommend user profiles to several users at once, based on the similarity of their embeddings.
+
+    Query Parameters:
+        user_ids (str): The comma-separated IDs of the users requesting recommendations.
+        limit (int, optional): The size of each recommendation.
+
+    Returns:
+        JSON: A JSON response containing the list of recommended user IDs of each user or an error message.
+        Status Code:
+            200: Success, returns recommended users by user ID.
+            400: Bad request, missing required parameters.
+            500: Server error, failed to generate recommendations.
+    """
+    user_ids = [user_id for user_id in request.args.get('user_ids', '').split(',') if user_id]
+    top_n = int(request.args.get('limit', 10))
+
+    if not user_ids:
+        return jsonify({"error": "Missing user_ids parameter"}), 400
+
+    try:
+        recommendations = em_recommender.recommend_users_batch(user_ids, top_n)
+        return jsonify({"recommended_users": recommendations})
+    except Exception as e:
+        logger.error(f"Error in recommend_users_batch: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @em_recommendation_bp.route('/posts', methods=['GET'])
 @jwt_required(not Config.NO_AUTH)
 def recommend_posts():
@@ -291,13 +322,13 @@ def recommend_posts():
     user_id = request.args.get('user_id')
     # interest_weight = float(request.args.get('interest_weight', 0.7))
     # interaction_weight = float(request.args.get('interaction_weight', 0.3))
-    # limit = int(request.args.get('limit', 10))
+    limit = int(request.args.get('limit', 10))
     
     if not user_id:
         return jsonify({"error": "Missing user_id parameter"}), 400
 
     try:
-        recommendations = ja_recommender.recommend_posts(user_id)
+        recommendations = ja_recommender.recommend_posts(user_id, limit)
         return jsonify({"recommended_posts": recommendations})
     except Exception as e:
         logger.error(f"Error in recommend_posts: {e}")
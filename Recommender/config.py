@@ -32,6 +32,9 @@ class Config:
     NEO4J_USER = os.getenv('NEO4J_USER') or 'neo4j'
     NEO4J_PASSWORD = os.getenv('NEO4J_PASSWORD') or 'neo4j'
     NEO4J_AUTH = os.getenv('NEO4J_AUTH')
+    NEO4J_MAX_POOL_SIZE = int(os.getenv('NEO4J_MAX_POOL_SIZE') or 100)
     MONGO_URI = os.getenv('MONGO_URI') or 'mongodb://localhost:27017/'
     MONGO_DB = os.getenv('MONGO_DB') or 'watif'
     NO_AUTH = bool(os.getenv('NO_AUTH'))
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND') or 'torch'
+    EMBEDDING_REFRESH_MINUTES = float(os.getenv('EMBEDDING_REFRESH_MINUTES') or 60)
@@ -83,6 +83,25 @@ class Utils:
         
         return average_matrix
 
+    @classmethod
+    def stack_mean(cls, matrices, size: int = None) -> np.ndarray:
+        """
+        Calcule la moyenne d'un itérable de vecteurs en une seule réduction vectorisée.
+
+        Args:
+            matrices (iterable of numpy.ndarray): Vecteurs à moyenner.
+            size (int, optional): Taille du vecteur nul renvoyé si l'itérable est vide.
+
+        Returns:
+            numpy.ndarray: Le vecteur moyen, en float32.
+        """
+        matrices = list(matrices)
+        if not matrices:
+            if size is None:
+                raise ValueError("La liste de matrices ne doit pas être vide.")
+            return np.zeros(size, dtype=np.float32)
+        return np.stack(matrices).mean(axis=0, dtype=np.float32)
+
     @classmethod
     def isiterable(cls, obj) -> bool:
         try:
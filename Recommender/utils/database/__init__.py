@@ -56,7 +56,8 @@ class Database(AuthDatabase):
             self.mongo_db = self.mongo_client[app.config['MONGO_DB']]
             self.neo4j_driver = GraphDatabase.driver(
                 app.config['NEO4J_URI'],
-                auth=(app.config['NEO4J_USER'], app.config['NEO4J_PASSWORD']) if app.config.get('NEO4J_AUTH') else None
+                auth=(app.config['NEO4J_USER'], app.config['NEO4J_PASSWORD']) if app.config.get('NEO4J_AUTH') else None,
+                max_connection_pool_size=app.config.get('NEO4J_MAX_POOL_SIZE', 100)
             )
             self.sync.set_conn(self.mongo_db, self.neo4j_driver)
         except Exception as e:
@@ -30,7 +30,7 @@ class Synchronizer:
         self.neo4j_driver = neo4j_driver
 
     def _create_constraints(self):
-        """Create necessary constraints in Neo4j."""
+        """Create necessary constraints and indexes in Neo4j."""
         with self.neo4j_driver.session() as session:
             # Create constraints for unique IDs
             constraints = [
@@ -45,6 +45,16 @@ class Synchronizer:
                 session.run(constraint)
             logging.info("Constraints created successfully.")
 
+            # Create range indexes on the properties the recommender engines anchor their queries on:
+            # User.id_user (MC_engine) and users.idUser (JA_engine)
+            indexes = [
+                "CREATE INDEX user_id_user IF NOT EXISTS FOR (u:User) ON (u.id_user)",
+                "CREATE INDEX users_id_user IF NOT EXISTS FOR (u:users) ON (u.idUser)"
+            ]
+            for index in indexes:
+                session.run(index)
+            logging.info("Indexes created successfully.")
+
     def _get_properties(self, entity, exclude_keys):
         return {k: v for k, v in entity.items() if k not in exclude_keys}
 
@@ -21,8 +21,9 @@ Usage:
 
 from ..database import Database
 
+from neo4j import READ_ACCESS
 import numpy as np
-import random
+import math
 
 class recommender_engine:
     """
@@ -42,6 +43,15 @@ class recommender_engine:
             db (Database): The Database instance for accessing Neo4j data.
         """
         self.db = db
+
+    def _read_session(self):
+        """
+        Opens a Neo4j session in read access mode, so that a cluster can route its queries to read replicas.
+
+        Returns:
+            neo4j.Session: The session, to be used as a context manager.
+        """
+        return self.db.neo4j_driver.session(default_access_mode=READ_ACCESS)
     
     def recommend_users(self, user_id: str) -> list[str]:
         """
@@ -90,7 +100,6 @@ class recommender_engine:
 
 # Mattéo
 # =====================================================================================================================
-from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
 
 class MC_engine(recommender_engine):
@@ -121,14 +130,18 @@ class MC_engine(recommender_engine):
         Returns:
             list[str]: A list of recommended user IDs, sorted by relevance.
         """
-        if not np.isclose(follow_weight + interest_weight, 1.0, rtol=1e-09, atol=1e-09):
+        if not math.isclose(follow_weight + interest_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
             raise ValueError('The sum of arguments follow_weight and interest_weight must be 1.0')
-        with self.db.neo4j_driver.session() as session:
+        with self._read_session() as session:
+            # The user's follows are collected once, then each candidate's follows are filtered against them
             scores = session.run("""
-                MATCH (u:User {id_user: $user_id})-[:INTERESTED_BY]->(i:Interest)<-[:INTERESTED_BY]-(u2:User)
+                MATCH (u:User {id_user: $user_id})
+                OPTIONAL MATCH (u)-[:FOLLOWS]->(uf:User)
+                WITH u, collect(uf) AS follows
+                MATCH (u)-[:INTERESTED_BY]->(i:Interest)<-[:INTERESTED_BY]-(u2:User)
                 WHERE u2.id_user <> $user_id
-                WITH u2, COUNT(i) AS common_interests
-                MATCH (u)-[:FOLLOWS]->(f:User)<-[:FOLLOWS]-(u2)
+                WITH u2, follows, COUNT(i) AS common_interests
+                MATCH (u2)-[:FOLLOWS]->(f:User) WHERE f IN follows
                 WITH u2, common_interests, COUNT(f) AS common_follows
                 RETURN u2.id_user AS user_id,
                        ($follow_weight * common_follows + $interest_weight * common_interests) AS score
@@ -149,14 +162,14 @@ class MC_engine(recommender_engine):
         Returns:
             list[str]: A list of recommended post IDs, sorted by relevance.
         """
-        if not np.isclose(interaction_weight + interest_weight, 1.0, rtol=1e-09, atol=1e-09):
+        if not math.isclose(interaction_weight + interest_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
             raise ValueError('The sum of arguments interaction_weight and interest_weight must be 1.0')
-        with self.db.neo4j_driver.session() as session:
+        with self._read_session() as session:
             scores = session.run("""
                 MATCH (u:User {id_user: $user_id})-[:INTERESTED_BY]->(i:Interest)<-[:HAS_KEY]-(p:Post)
-                WITH p, COUNT(i) AS interest_score
-                OPTIONAL MATCH (u)-[:LIKES|:COMMENTED_ON]->(p)
-                WITH p, interest_score, COUNT(u) AS interaction_score
+                WITH u, p, COUNT(i) AS interest_score
+                OPTIONAL MATCH (u)-[r:LIKES|COMMENTED_ON]->(p)
+                WITH p, interest_score, COUNT(r) AS interaction_score
                 RETURN p.id_post AS post_id,
                        ($interest_weight * interest_score + $interaction_weight * interaction_score) AS score
                 ORDER BY score DESC
@@ -176,12 +189,12 @@ class MC_engine(recommender_engine):
         Returns:
             list[str]: A list of recommended thread IDs, sorted by relevance.
         """
-        if not np.isclose(member_weight + interest_weight, 1.0, rtol=1e-09, atol=1e-09):
+        if not math.isclose(member_weight + interest_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
             raise ValueError('The sum of arguments member_weight and interest_weight must be 1.0')
-        with self.db.neo4j_driver.session() as session:
+        with self._read_session() as session:
             scores = session.run("""
                 MATCH (u:User {id_user: $user_id})-[:MEMBER_OF]->(t:Thread)<-[:MEMBER_OF]-(u2:User)
-                WITH t, COUNT(u2) AS member_score
+                WITH u, t, COUNT(u2) AS member_score
                 MATCH (u)-[:INTERESTED_BY]->(i:Interest)<-[:HAS_KEY]-(t)
                 WITH t, member_score, COUNT(i) AS interest_score
                 RETURN t.id_thread AS thread_id,
@@ -193,25 +206,58 @@ class MC_engine(recommender_engine):
 
 # Mattéo - embedding
 # =====================================================================================================================
-from .embedding import MC_embedder
+from .embedding import MC_embedder, EmbeddingTable
 from ... import logger
+from ...config import Config
 class EM_engine(recommender_engine):
     def __init__(self, db: Database) -> None:
         super().__init__(db)
-        self.embedder = MC_embedder(db, logger=logger)
+        self.embedder = MC_embedder(db, logger=logger, backend=Config.EMBEDDING_BACKEND)
 
-    def _get_embedding(self, entity_type: str, entity_id: int |str | bytes) -> np.ndarray:
+    def _get_embedding(self, entity_type: str, entity_id: int |str | bytes) -> np.ndarray | EmbeddingTable:
         """
         Retrieve the embedding vector for a given entity from MongoDB.
         
         Args:
-            entity_type (str): The type of entity (e.g., 'user', 'post', 'thread').
+            entity_type (str): The type of entity (e.g., 'user', 'post', 'thread'), or a collection
+                (e.g., 'users', 'posts', 'threads') to retrieve the embeddings of all its entities.
             entity_id (str): The ID of the entity.
         
         Returns:
-            np.ndarray: The embedding vector for the entity.
+            np.ndarray | EmbeddingTable: The embedding vector for the entity, or the table of the
+            collection's embeddings.
+        """
+        return self.embedder.encode(entity_type, entity_id)
+
+    def _get_table(self, collection: str) -> EmbeddingTable:
+        """
+        Retrieve the in-memory embeddings of a collection, as of the last refresh.
+
+        Embeddings are never computed here: the refresh job computes them, and is started by the first
+        call when the application didn't start it already (e.g. when served by `flask run` or gunicorn).
+
+        Args:
+            collection (str): The collection (e.g., 'users', 'posts', 'threads').
+
+        Returns:
+            EmbeddingTable: The embeddings of the collection's entities.
+        """
+        if Config.EMBEDDING_REFRESH_MINUTES > 0:
+            self.embedder.start_refresh(Config.EMBEDDING_REFRESH_MINUTES)
+        return self.embedder.get_table(collection)
+
+    def _get_user_vector(self, id_user, users: EmbeddingTable) -> np.ndarray | None:
+        """
+        Retrieve a user's embedding from the in-memory users table.
+
+        Args:
+            id_user (str): The ID of the user.
+            users (EmbeddingTable): The users' embeddings.
+
+        Returns:
+            np.ndarray | None: The embedding vector of the user, or None until the next refresh embeds them.
         """
-        self.embedder.encode(entity_type, entity_id)
+        return users.get(id_user)
 
     def recommend_users(self, id_user, top_n=50):
         """
@@ -224,26 +270,41 @@ class EM_engine(recommender_engine):
         Returns:
             list: A list of recommended user IDs.
         """
-        user_embedding = self._get_embedding("users", id_user)
+        # All users' embeddings as one (N, D) matrix, as of the last refresh
+        users = self._get_table("users")
+        user_embedding = self._get_user_vector(id_user, users)
         if user_embedding is None:
             return []
-        
-        # Fetch all users' embeddings except the target user
-        users = list(self.db.mongo_db["users"].find({"_id": {"$ne": id_user}}, {"_id": 1, "embedding": 1}))
-        
-        user_ids = []
-        user_embeddings = []
-        for user in users:
-            user_ids.append(user["_id"])
-            user_embeddings.append(np.array(self._get_embedding("user", user["_id"])))
-
-        # Calculate cosine similarity between the target user and all other users
-        user_embeddings = np.vstack(user_embeddings)
-        similarities = cosine_similarity([user_embedding], user_embeddings).flatten()
-        
-        # Get top N similar users
-        recommended_ids = [user_ids[i] for i in np.argsort(similarities)[-top_n:][::-1]]
-        return recommended_ids
+
+        # Get top N users by cosine similarity, except the target user
+        ranked_ids = users.search(user_embedding, top_n + 1)
+        return [user_id for user_id in ranked_ids if user_id != id_user][:top_n]
+
+    def recommend_users_batch(self, ids_user, top_n=50):
+        """
+        Recommend users to several users at once, based on similarity of embeddings.
+
+        The similarities of all the given users are computed together, with a single matrix product.
+
+        Args:
+            ids_user (list): The IDs of the users.
+            top_n (int): The number of recommendations to return per user.
+
+        Returns:
+            dict: The list of recommended user IDs of each user, by user ID. Users without an embedding are left out.
+        """
+        # All users' embeddings as one (N, D) matrix, as of the last refresh
+        users = self._get_table("users")
+        ids_user = [id_user for id_user in ids_user if id_user in users]
+        if not ids_user:
+            return {}
+
+        # Get top N users by cosine similarity for every user, except the user themselves
+        ranked = users.search_many(np.stack([users[id_user] for id_user in ids_user]), top_n + 1)
+        return {
+            id_user: [user_id for user_id in ranked_ids if user_id != id_user][:top_n]
+            for id_user, ranked_ids in zip(ids_user, ranked)
+        }
 
     def recommend_posts(self, id_user, top_n=50):
         """
@@ -256,26 +317,15 @@ class EM_engine(recommender_engine):
         Returns:
             list: A list of recommended post IDs.
         """
-        user_embedding = self._get_embedding("user", id_user)
+        user_embedding = self._get_user_vector(id_user, self._get_table("users"))
         if user_embedding is None:
             return []
-        
-        # Fetch all posts' embeddings
-        posts = list(self.db.mongo_db["posts"].find({}, {"_id": 1, "embedding": 1}))
-        
-        post_ids = []
-        post_embeddings = []
-        for post in posts:
-            post_ids.append(post["_id"])
-            post_embeddings.append(np.array(self._get_embedding("post", post["_id"])))
-
-        # Calculate cosine similarity between the user and all posts
-        post_embeddings = np.vstack(post_embeddings)
-        similarities = cosine_similarity([user_embedding], post_embeddings).flatten()
-        
-        # Get top N similar posts
-        recommended_ids = [post_ids[i] for i in np.argsort(similarities)[-top_n:][::-1]]
-        return recommended_ids
+
+        # All posts' embeddings as one (N, D) matrix, as of the last refresh
+        posts = self._get_table("posts")
+
+        # Get top N posts by cosine similarity with the user
+        return posts.search(user_embedding, top_n)
 
     def recommend_threads(self, id_user, top_n=50):
         """
@@ -288,31 +338,44 @@ class EM_engine(recommender_engine):
         Returns:
             list: A list of recommended thread IDs.
         """
-        user_embedding = self._get_embedding("user", id_user)
+        user_embedding = self._get_user_vector(id_user, self._get_table("users"))
         if user_embedding is None:
             return []
-        
-        # Fetch all threads' embeddings
-        threads = list(self.db.mongo_db["threads"].find({}, {"_id": 1, "embedding": 1}))
-        
-        thread_ids = []
-        thread_embeddings = []
-        for thread in threads:
-            if "embedding" in thread:
-                thread_ids.append(thread["_id"])
-                thread_embeddings.append(np.array(self._get_embedding("thread", thread["_id"])))
-
-        # Calculate cosine similarity between the user and all threads
-        thread_embeddings = np.vstack(thread_embeddings)
-        similarities = cosine_similarity([user_embedding], thread_embeddings).flatten()
-        
-        # Get top N similar threads
-        recommended_ids = [thread_ids[i] for i in np.argsort(similarities)[-top_n:][::-1]]
-        return recommended_ids
+
+        # All threads' embeddings as one (N, D) matrix, as of the last refresh
+        threads = self._get_table("threads")
+
+        # Get top N threads by cosine similarity with the user
+        return threads.search(user_embedding, top_n)
 
 # Jean-Alexis
 # =====================================================================================================================
 class JA_engine(recommender_engine):
+    # Jaccard index over the hashtags of the user's posts, or over the user's and the authors'
+    # interests when the user hasn't used any hashtag yet, computed by Neo4j in a single round-trip
+    _RECOMMEND_POSTS_QUERY = """
+            MATCH (u:users {idUser: $id_user})
+            OPTIONAL MATCH (u)-[:WRITED_BY]->(:posts)-[:HAS_KEY]->(uk:keys)
+            WITH u, collect(DISTINCT uk.idKey) AS user_keys
+            OPTIONAL MATCH (u)-[:INTERESTED_BY]->(ui:interests)
+            WITH u, user_keys, collect(DISTINCT ui.idInterest) AS user_interests
+            MATCH (p:posts) WHERE NOT (u)-[:WRITED_BY]->(p)
+            OPTIONAL MATCH (p)-[:HAS_KEY]->(k:keys)
+            WITH p, user_keys, user_interests, collect(DISTINCT k.idKey) AS keys
+            OPTIONAL MATCH (a:users)-[:WRITED_BY]->(p)
+            OPTIONAL MATCH (a)-[:INTERESTED_BY]->(ai:interests)
+            WITH p, user_keys, user_interests, keys, collect(DISTINCT ai.idInterest) AS interests
+            WITH p,
+                 CASE WHEN size(user_keys) > 0 THEN user_keys ELSE user_interests END AS user_set,
+                 CASE WHEN size(user_keys) > 0 THEN keys ELSE interests END AS post_set
+            WITH p, size(user_set) + size(post_set) AS total, size([x IN post_set WHERE x IN user_set]) AS common
+            RETURN p.idPost AS id_post,
+                   CASE WHEN total = common THEN 0.0 ELSE toFloat(common) / (total - common) END AS score
+            ORDER BY score DESC
+    """
+    # Same ranking cut to the top $limit posts, which Neo4j selects with a bounded heap instead of a full sort
+    _RECOMMEND_POSTS_TOP_K_QUERY = _RECOMMEND_POSTS_QUERY + "LIMIT $limit\n"
+
     def get_hastags(self, id_user: str) -> set:
         """
         Retrieve hashtags used by a specific user.
@@ -323,15 +386,14 @@ class JA_engine(recommender_engine):
         Returns:
             set: A set of hashtags used by the user.
         """
-        with self.db.neo4j_driver.session() as session:
+        with self._read_session() as session:
+            # The hashtags are deduplicated by Neo4j and come back as a single row
             hashtags = session.run(
-                "MATCH (u:users),(p:posts),(k:keys) WHERE u.idUser = $id_user RETURN k.idKey AS ids",
+                "MATCH (u:users {idUser: $id_user})-[:WRITED_BY]->(:posts)-[:HAS_KEY]->(k:keys) "
+                "RETURN collect(DISTINCT k.idKey) AS ids",
                 id_user=str(id_user)
-            )
-            hashtag_set = set()
-            for record in hashtags:
-                hashtag_set.update(record["ids"])
-            return hashtag_set
+            ).single()
+            return set(hashtags["ids"]) if hashtags else set()
 
     def recommend_users(self, id_user: str, follow_weight: float = 0.4, intrest_weight: float = 0.6) -> list[str]:
         """
@@ -352,107 +414,60 @@ class JA_engine(recommender_engine):
             >>> recommender.recommend_users(123, follow_weight=0.5, intrest_weight=0.5)
             [456, 789, 1011]
         """
-        if not np.isclose(follow_weight + intrest_weight, 1.0, rtol=1e-09, atol=1e-09):
+        if not math.isclose(follow_weight + intrest_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
             raise ValueError('The sum of arguments follow_weight and intrest_weight must be 1.0')
-        with self.db.neo4j_driver.session() as session:
-            user = session.run(
-                "MATCH (u:users) WHERE u.idUser = $id_user RETURN u",
-                id_user=str(id_user)
-            ).single()
-
-            users = session.run(
-                "MATCH (u:users) WHERE u.idUser <> $id_user RETURN u",
-                id_user=id_user
-            )
-
-            scores = {}
-            user_follows = {rel.end_node for rel in session.run(
-                "MATCH (u:users)-[f:FOLLOWS]->(f2:users) WHERE u.idUser = $id_user RETURN f2",
-                id_user=id_user
-            )}
-
-            user_interests = {rel.end_node["idInterest"] for rel in session.run(
-                "MATCH (u:users)-[ib:INTERESTED_BY]->(i:interests) WHERE u.idUser = $id_user RETURN i",
-                id_user=id_user
-            )}
-
-            for u in users:
-                u_follows = {rel.end_node for rel in session.run(
-                    "MATCH (u:users)-[f:FOLLOWS]->(f2:users) WHERE u.id_user = $id_user RETURN f2",
-                    id_user=u["u"]["idUser"]
-                )}
-
-                follows_score = len(user_follows & u_follows) / len(user_follows | u_follows) if user_follows and u_follows else 0
-
-                u_interests = {rel.end_node["idInterest"] for rel in session.run(
-                    "MATCH (u:users)-[ib:INTERESTED_BY]->(i:interests) WHERE u.idUser = $id_user RETURN i",
-                    id_user=u["u"]["idUser"]
-                )}
-
-                interests_score = len(user_interests & u_interests) / len(user_interests | u_interests) if user_interests and u_interests else 0
-
-                rec_score = ((follows_score*follow_weight) + (interests_score*intrest_weight)) / 2
-                scores[u["u"]["idUser"]] = rec_score
-
-            return sorted(scores, key=scores.get, reverse=True)
+        with self._read_session() as session:
+            # Both Jaccard indexes are computed by Neo4j in a single round-trip
+            scores = session.run("""
+                MATCH (u:users {idUser: $id_user})
+                OPTIONAL MATCH (u)-[:FOLLOWS]->(uf:users)
+                WITH u, collect(DISTINCT uf.idUser) AS user_follows
+                OPTIONAL MATCH (u)-[:INTERESTED_BY]->(ui:interests)
+                WITH user_follows, collect(DISTINCT ui.idInterest) AS user_interests
+                MATCH (u2:users) WHERE u2.idUser <> $id_user
+                OPTIONAL MATCH (u2)-[:FOLLOWS]->(f:users)
+                WITH u2, user_follows, user_interests, collect(DISTINCT f.idUser) AS follows
+                OPTIONAL MATCH (u2)-[:INTERESTED_BY]->(i:interests)
+                WITH u2, user_follows, user_interests, follows, collect(DISTINCT i.idInterest) AS interests
+                WITH u2, user_follows, user_interests, follows, interests,
+                     size([x IN follows WHERE x IN user_follows]) AS common_follows,
+                     size([x IN interests WHERE x IN user_interests]) AS common_interests
+                WITH u2,
+                     CASE WHEN size(user_follows) = 0 OR size(follows) = 0 THEN 0.0
+                          ELSE toFloat(common_follows) / (size(user_follows) + size(follows) - common_follows)
+                     END AS follows_score,
+                     CASE WHEN size(user_interests) = 0 OR size(interests) = 0 THEN 0.0
+                          ELSE toFloat(common_interests) / (size(user_interests) + size(interests) - common_interests)
+                     END AS interests_score
+                RETURN u2.idUser AS id_user,
+                       (follows_score * $follow_weight + interests_score * $intrest_weight) / 2 AS score
+                ORDER BY score DESC
+            """, id_user=str(id_user), follow_weight=follow_weight, intrest_weight=intrest_weight)
+            return [record["id_user"] for record in scores]
 
-    def recommend_posts(self, id_user: str) -> list[str]:
+    def recommend_posts(self, id_user: str, limit: int = None) -> list[str]:
         """
         Generate post recommendations for a specific user based on hashtags and interests.
 
         Args:
             id_user (str): The ID of the user.
+            limit (int, optional): The number of posts to recommend. All the posts are ranked by default.
 
         Returns:
             list: A sorted list of recommended post IDs.
         """
-        with self.db.neo4j_driver.session() as session:
-            posts = session.run(
-                "MATCH (u:users),(p:posts) WHERE u.idUser <> $id_user RETURN p",
-                id_user=str(id_user)
-            )
-
-            user_hashtags = self.get_hastags(id_user)
-            scores = {}
-            print(user_hashtags)
-
-            if not user_hashtags:
-                user_interests = session.run(
-                    "MATCH (u:users)-[ib:INTERESTED_BY]->(i:interests) WHERE u.idUser = $id_user RETURN i.idInterest AS interests",
-                    id_user=id_user
-                ).single()["interests"]
-
-                for post in posts:
-                    id_author = session.run(
-                        "MATCH (u:users),(p:posts) WHERE u.idUser = $id_user RETURN u.idUser AS id",
-                        id_user=str(post["idPost"])
-                    ).single()["id"]
-
-                    u = session.run(
-                        "MATCH (u:users)-[ib:INTERESTED_BY]->(i:interests) WHERE u.id_user = $id_author RETURN i.idInterest AS interests",
-                        id_author=id_author
-                    ).single()["interests"]
-
-                    interests_score = len(set(user_interests) & set(u)) / len(set(user_interests) | set(u))
-                    scores[post["idPost"]] = interests_score
+        with self._read_session() as session:
+            if limit is None:
+                scores = session.run(self._RECOMMEND_POSTS_QUERY, id_user=str(id_user))
             else:
-                for post in posts:
-                    hashtags = session.run(
-                        "MATCH (p:posts),(k:keys) WHERE p.idPost = $idPost RETURN k.idKey AS ids",
-                        idPost=str(post["idPost"])
-                    )
-                    post_hashtags = set()
-                    for record in hashtags:
-                        post_hashtags.update(record["ids"])
-
-                    score = len(user_hashtags & post_hashtags) / len(user_hashtags | post_hashtags)
-                    scores[post["idPost"]] = score
-
-            scores_tab = sorted(scores, key=scores.get, reverse=True)
-
-            for s in range(len(scores_tab)):
-                if random.random() >= 0.8:
-                    scores_tab.insert(s, scores_tab[-1])
-                    del scores_tab[-1]
-
-            return scores_tab
+                scores = session.run(self._RECOMMEND_POSTS_TOP_K_QUERY, id_user=str(id_user), limit=limit)
+            scores_tab = [record["id_post"] for record in scores]
+
+            # Each position has a 20% chance of being given the least relevant post not placed yet,
+            # the others keep the remaining posts in order
+            swaps = np.random.random(len(scores_tab)) >= 0.8
+            n_swaps = int(swaps.sum())
+            order = np.empty(len(scores_tab), dtype=np.intp)
+            order[~swaps] = np.arange(len(scores_tab) - n_swaps)
+            order[swaps] = np.arange(len(scores_tab) - 1, len(scores_tab) - n_swaps - 1, -1)
+            return [scores_tab[i] for i in order]
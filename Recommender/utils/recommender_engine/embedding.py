@@ -7,6 +7,7 @@ similarities between users, posts, threads, interests, and other social media en
 
 Classes:
     - embedder: A base class for generating embeddings using a specified language model.
+    - EmbeddingTable: A read-only mapping of entity IDs to embeddings, backed by a sorted ID array.
     - local_embedder: A specialized embedder that saves and loads embeddings locally from files.
     - integrated_embedder: An embedder that integrates with a Database instance for retrieving entity embeddings.
     - watif_embedder: An abstract class defining methods for getting various types of embeddings 
@@ -22,7 +23,6 @@ Functions:
     - get_thread_embedding: Generates an embedding for a thread, weighted by attributes like author, members, and related posts.
     - get_key_embedding: Retrieves the embedding for a specific keyword.
     - get_interest_embedding: Retrieves the embedding for a specific interest.
-    - _get_embedding: Utility function to get an entity embedding from the database.
 
 Examples:
     # Initialize an MC_embedder with a database instance and model
@@ -33,38 +33,124 @@ Examples:
 
 Requirements:
     - `numpy`: For handling embedding arrays.
-    - `scikit-learn`: For cosine similarity calculations.
+    - `pymongo`: For bulk writes of the generated embeddings.
+    - `faiss-cpu` (optional): For the inner-product index behind `EmbeddingTable.search`.
+    - `numba` (optional): For the compiled kernel behind `_weighted_mix`.
+    - `optimum[onnxruntime]` / `optimum[openvino]` (optional): For the 'onnx' / 'openvino' inference backends.
     - `sentence-transformers`: For the language model used to generate embeddings.
+    - `torch`: For selecting the device the language model runs on (installed with `sentence-transformers`).
 
 """
 
 from sentence_transformers import SentenceTransformer
-from threading import Lock, local, current_thread
+from threading import Event, Lock, Thread, current_thread
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from contextlib import contextmanager
+from collections import OrderedDict
+from collections.abc import Mapping
 from time import perf_counter
+from pymongo import UpdateOne
+from bson import Binary
 import numpy as np
+import torch
+import hashlib
+import math
 import logging
+import json
 import os
 
 from ..database import Database
 from .. import Utils
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+def _weighted_mix(parts: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Computes the weighted sum of stacked embeddings.
+    Runs a Numba-compiled kernel when `numba` is installed.
+
+    Args:
+        parts (np.ndarray): Embeddings to mix, of shape (K, D).
+        weights (np.ndarray): Weight of each embedding, of shape (K,).
+
+    Returns:
+        np.ndarray: The mixed embedding, of shape (D,).
+    """
+    if njit is None:
+        return np.einsum('i,ij->j', np.asarray(weights, dtype=np.float32), np.asarray(parts, dtype=np.float32))
+    return _weighted_mix_kernel(np.ascontiguousarray(parts, dtype=np.float32),
+                                np.ascontiguousarray(weights, dtype=np.float32))
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _weighted_mix_kernel(parts: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        k, dim = parts.shape
+        out = np.zeros(dim, dtype=np.float32)
+        # Row-wise accumulation keeps the inner loop contiguous, so LLVM vectorizes it into FMAs
+        for i in range(k):
+            w = weights[i]
+            for j in range(dim):
+                out[j] += w * parts[i, j]
+        return out
+
+    # Compile once at import time rather than on the first request
+    _weighted_mix_kernel(np.zeros((4, 384), dtype=np.float32), np.zeros(4, dtype=np.float32))
+
 
 class embedder(object):
     """Embedder using SentenceTransformer for encoding textual objects."""
-    def __init__(self, model: str = 'all-MiniLM-L6-v2', *args, **kwargs) -> None:
+    # Sentences longer than this are encoded without going through the sentence cache
+    _SENTENCE_CACHE_MAX_CHARS = 512
+    _SENTENCE_CACHE_SIZE = 10_000
+    # Prompts registered on the model, prepended to the matching entity fields before encoding
+    PROMPTS = {
+        'title': 'Titre:\n',
+        'content': 'Content:\n',
+        'thread': 'Discussion name:\n',
+    }
+
+    def __init__(self, model: str = 'all-MiniLM-L6-v2', *args, device: str = None, backend: str = 'torch', **kwargs) -> None:
         """
         Initializes the embedder with a specified model.
 
         Args:
             model (str): Model name for SentenceTransformer.
             *args: Additional arguments for SentenceTransformer.
+            device (str): Device to run the model on. Defaults to CUDA when available, CPU otherwise.
+            backend (str): Inference backend: 'torch', 'onnx' or 'openvino'. Falls back to 'torch' when the
+                backend's libraries (optimum, onnxruntime / openvino) aren't installed. A quantized export can
+                be selected with `model_kwargs={'file_name': ...}`.
             **kwargs: Additional keyword arguments for SentenceTransformer.
         """
-        self.model = SentenceTransformer(model, *args, **kwargs)
-
-    def encode(self, obj: object, show_progress_bar: bool = True, *args, **kwargs) -> np.ndarray:
+        device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        kwargs.setdefault('prompts', self.PROMPTS)
+        self.model = None
+        if backend != 'torch':
+            try:
+                self.model = SentenceTransformer(model, *args, device=device, backend=backend, **kwargs)
+            except Exception as e:
+                logging.getLogger(__name__).warning("Can't load %s with the %s backend, falling back to torch: %s",
+                                                    model, backend, e)
+                kwargs.pop('model_kwargs', None)
+        if self.model is None:
+            self.model = SentenceTransformer(model, *args, device=device, **kwargs)
+            if device.startswith('cuda'):
+                # Half precision weights halve GPU memory traffic, with no noticeable loss on embeddings
+                self.model.half()
+        self._sentence_cache = OrderedDict()
+        self._sentence_cache_lock = Lock()
+
+    def encode(self, obj: object, show_progress_bar: bool = False, *args, **kwargs) -> np.ndarray:
         """
         Encodes an object to generate embeddings.
 
@@ -79,6 +165,313 @@ class embedder(object):
         """
         return self.model.encode(obj, show_progress_bar=show_progress_bar, *args, **kwargs)
 
+    def _prompted(self, prompt_name: str, sentences: list[str]) -> list[str]:
+        """
+        Prepends one of the model's registered prompts to each sentence.
+
+        Args:
+            prompt_name (str): Key of the prompt in the model's `prompts`.
+            sentences (list[str]): Sentences to prefix.
+
+        Returns:
+            list[str]: The prompted sentences.
+        """
+        prompt = self.model.prompts[prompt_name]
+        return [prompt + sentence for sentence in sentences]
+
+    def _encode_sentence(self, sentence: str, prompt_name: str = None) -> np.ndarray:
+        """
+        Encodes a single sentence, memoizing the result for short sentences.
+
+        Args:
+            sentence (str): Sentence to encode.
+            prompt_name (str): Name of the registered prompt prepended to the sentence.
+
+        Returns:
+            np.ndarray: Encoded embedding.
+        """
+        if prompt_name is not None:
+            sentence, = self._prompted(prompt_name, [sentence])
+        return self._encode_sentences([sentence])[0]
+
+    def _encode_sentences(self, sentences: list[str]) -> list[np.ndarray]:
+        """
+        Encodes a few sentences in a single batched forward pass, memoizing the results for short sentences.
+
+        Names, titles and their prompts come back identical across requests, so their
+        tokenization and forward pass are only paid once. The returned arrays are read-only.
+
+        Args:
+            sentences (list[str]): Sentences to encode, prompts included.
+
+        Returns:
+            list[np.ndarray]: The embeddings, in the order of `sentences`.
+        """
+        with self._sentence_cache_lock:
+            vectors = []
+            for sentence in sentences:
+                vector = self._sentence_cache.get(sentence)
+                if vector is not None:
+                    self._sentence_cache.move_to_end(sentence)
+                vectors.append(vector)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+        encoded = self.model.encode([sentences[i] for i in missing], batch_size=len(missing),
+                                    show_progress_bar=False, convert_to_numpy=True)
+        encoded.setflags(write=False)
+
+        with self._sentence_cache_lock:
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+                if len(sentences[i]) <= self._SENTENCE_CACHE_MAX_CHARS:
+                    self._sentence_cache[sentences[i]] = vector
+            while len(self._sentence_cache) > self._SENTENCE_CACHE_SIZE:
+                self._sentence_cache.popitem(last=False)
+        return vectors
+
+
+# BSON binary subtype (user-defined range) marking float16 embeddings
+_FLOAT16_SUBTYPE = 0x80
+
+
+def _pack_vector(vector: np.ndarray) -> Binary:
+    """
+    Packs an embedding as raw float16 bytes for storage in MongoDB.
+
+    Stored embeddings are L2-normalized, so half precision keeps about three significant digits per
+    component, which leaves similarity rankings unchanged while halving what full scans move.
+    """
+    return Binary(np.ascontiguousarray(vector, dtype=np.float16).tobytes(), subtype=_FLOAT16_SUBTYPE)
+
+
+def _unpack_vector(data) -> np.ndarray:
+    """
+    Reads an embedding stored in MongoDB as float32.
+
+    float16 embeddings are widened on read, and embeddings stored as a list of doubles are still accepted.
+    """
+    if isinstance(data, Binary) and data.subtype == _FLOAT16_SUBTYPE:
+        return np.frombuffer(data, dtype=np.float16).astype(np.float32)
+    return np.asarray(data, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalizes an embedding (or each row of a matrix of embeddings), so that cosine similarity
+    between stored embeddings reduces to a dot product.
+
+    Args:
+        vectors (np.ndarray): Embedding of shape (D,) or embeddings of shape (N, D).
+
+    Returns:
+        np.ndarray: The normalized embedding(s).
+    """
+    return vectors / (np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-12)
+
+
+def _id_array(ids: list) -> np.ndarray:
+    """
+    Packs entity IDs into an object array, so that they keep their type (`np.array` would turn
+    a mix of ints and strings into strings).
+    """
+    array = np.empty(len(ids), dtype=object)
+    array[:] = ids
+    return array
+
+
+class EmbeddingTable(Mapping):
+    """
+    Read-only mapping of entity IDs to embeddings.
+
+    IDs are kept in an array giving the order of the rows and looked up through an ID -> row dictionary,
+    so the embedding rows can live in a single (possibly memory-mapped) array and be returned as views
+    instead of copies. IDs are only hashed and compared for equality, so a table can mix ID types
+    (ObjectId, str, int): looking up an ID of another type simply misses. The whole matrix is exposed
+    as `embs`, so similarities against every entity are a single `embs @ q`.
+    """
+    # From this many rows on, `search` switches from exact to approximate (HNSW) FAISS search
+    _HNSW_MIN_ROWS = 100_000
+    _HNSW_NEIGHBORS = 32
+    _HNSW_EF_SEARCH = 128
+
+    def __init__(self, ids: np.ndarray, embs: np.ndarray) -> None:
+        """
+        Initializes the table from parallel ID and embedding arrays.
+
+        Args:
+            ids (np.ndarray): Unique entity IDs, one per row of `embs`.
+            embs (np.ndarray): Embeddings, of shape (N, D).
+        """
+        self.ids = ids
+        self.embs = embs
+        self._positions = {entity_id: row for row, entity_id in enumerate(ids.tolist())}
+        self._index = None
+
+    @classmethod
+    def from_dict(cls, vectors: dict) -> 'EmbeddingTable':
+        """
+        Builds a table from a dictionary of embeddings, packing them into one contiguous float32 matrix.
+
+        Args:
+            vectors (dict): A dictionary with entity IDs as keys and their embeddings (np.ndarray) as values.
+
+        Returns:
+            EmbeddingTable: The table.
+        """
+        if not vectors:
+            return cls(np.empty(0), np.empty((0, 0), dtype=np.float32))
+        return cls(_id_array(list(vectors.keys())), np.stack(list(vectors.values())).astype(np.float32))
+
+    def search(self, query: np.ndarray, k: int) -> list:
+        """
+        Finds the entities whose embeddings have the highest inner product with `query`.
+
+        Once `build_index` has been called, the search goes through its FAISS index. Otherwise, the top k
+        of `embs @ query` are selected with `np.argpartition`.
+        Stored embeddings are L2-normalized, so the inner product is the cosine similarity.
+
+        Args:
+            query (np.ndarray): Query embedding, of shape (D,).
+            k (int): Number of IDs to return.
+
+        Returns:
+            list: The IDs of the `k` most similar entities, most similar first.
+        """
+        return self.search_many(np.reshape(query, (1, -1)), k)[0]
+
+    def search_many(self, queries: np.ndarray, k: int) -> list[list]:
+        """
+        Same as `search` for several queries at once.
+
+        All the similarities are computed by a single matrix-matrix product (or FAISS batch search), which
+        makes much better use of the CPU than one matrix-vector product per query.
+
+        Args:
+            queries (np.ndarray): Query embeddings, of shape (K, D).
+            k (int): Number of IDs to return per query.
+
+        Returns:
+            list[list]: For each query, the IDs of the `k` most similar entities, most similar first.
+        """
+        k = min(k, len(self.ids))
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        index = self._index
+        if index is not None:
+            _, rows = index.search(queries, k)
+            # HNSW pads with -1 when it reaches fewer than k entities
+            return [self.ids[row[row >= 0]].tolist() for row in rows]
+        similarities = queries @ self.embs.T
+        if k < similarities.shape[1]:
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape)
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(similarities, top, axis=1), axis=1), axis=1)
+        return [self.ids[row].tolist() for row in top]
+
+    def build_index(self) -> None:
+        """
+        Builds the FAISS index `search` goes through, if `faiss` is installed and the table has none yet.
+
+        The index is an exact `IndexFlatIP`, or an approximate `IndexHNSWFlat` for tables of at least
+        `_HNSW_MIN_ROWS` rows, whose searches are logarithmic in the table size. It is only swapped in once
+        complete, so it can be built on a background thread while the table is being searched.
+        """
+        if faiss is None or self._index is not None or not len(self.ids):
+            return
+        dim = self.embs.shape[1]
+        if len(self.ids) >= self._HNSW_MIN_ROWS:
+            index = faiss.IndexHNSWFlat(dim, self._HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = self._HNSW_EF_SEARCH
+        else:
+            index = faiss.IndexFlatIP(dim)
+        index.add(np.ascontiguousarray(self.embs, dtype=np.float32))
+        self._index = index
+
+    def updated(self, vectors: Mapping, keep=None) -> 'EmbeddingTable':
+        """
+        Returns a copy of the table with some embeddings added, replaced or dropped.
+
+        The table itself is left untouched, so it can keep being searched concurrently, and is returned
+        as is when there is nothing to change, which keeps its search index.
+
+        Args:
+            vectors (Mapping): Embeddings to add or replace, by entity ID.
+            keep (Iterable, optional): IDs to keep from the current table; the others are dropped.
+
+        Returns:
+            EmbeddingTable: The updated table.
+        """
+        ids, embs = self.ids, self.embs
+        if keep is not None:
+            keep = keep if isinstance(keep, (set, frozenset, Mapping)) else set(keep)
+            kept = np.fromiter((entity_id in keep for entity_id in ids.tolist()), dtype=bool, count=len(ids))
+            if not kept.all():
+                ids, embs = ids[kept], embs[kept]
+        if not vectors:
+            return self if ids is self.ids else EmbeddingTable(ids, embs)
+        new = vectors if isinstance(vectors, EmbeddingTable) else EmbeddingTable.from_dict(vectors)
+        if not len(ids):
+            return new
+        kept = np.fromiter((entity_id not in new for entity_id in ids.tolist()), dtype=bool, count=len(ids))
+        return EmbeddingTable(np.concatenate([ids[kept], new.ids]), np.concatenate([embs[kept], new.embs]))
+
+    def _row(self, entity_id) -> int | None:
+        """Returns the row index of `entity_id`, or None if it isn't in the table."""
+        try:
+            return self._positions.get(entity_id)
+        except TypeError:
+            # Unhashable IDs (e.g. lists) can't be in the table
+            return None
+
+    def _rows(self, entity_ids) -> np.ndarray:
+        """Returns the row indices of `entity_ids`, with -1 for the IDs that aren't in the table."""
+        rows = (self._row(entity_id) for entity_id in entity_ids)
+        return np.fromiter((-1 if row is None else row for row in rows), dtype=np.intp, count=len(entity_ids))
+
+    def __getitem__(self, entity_id) -> np.ndarray:
+        i = self._row(entity_id)
+        if i is None:
+            raise KeyError(entity_id)
+        return self.embs[i]
+
+    def __contains__(self, entity_id) -> bool:
+        return self._row(entity_id) is not None
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _group_means(table: EmbeddingTable, groups: list[list], dim: int) -> np.ndarray:
+    """
+    Averages the embeddings of several groups of entities at once.
+
+    Args:
+        table (EmbeddingTable): Embeddings of the entities.
+        groups (list[list]): Entity IDs of each group; IDs missing from `table` are ignored.
+        dim (int): Embedding dimension.
+
+    Returns:
+        np.ndarray: The (len(groups), dim) matrix of group means, with a zero row for groups
+        without any embedded entity.
+    """
+    out = np.zeros((len(groups), dim), dtype=np.float32)
+    flat = [entity_id for group in groups for entity_id in group]
+    if not flat:
+        return out
+    segments = np.repeat(np.arange(len(groups)), [len(group) for group in groups])
+    rows = table._rows(flat)
+    found = rows >= 0
+    np.add.at(out, segments[found], table.embs[rows[found]])
+    out /= np.maximum(np.bincount(segments[found], minlength=len(groups)), 1)[:, None]
+    return out
+
 
 class local_embedder:
     """Embedder class with local saving/loading capabilities for embeddings."""
@@ -95,29 +488,68 @@ class local_embedder:
         super().__init__(model, *args, **kwargs)
         self.filext = '_embeddings.npy'
 
-    def load_embeddings(self, path):
+    def load_embeddings(self, path) -> Mapping:
         """
         Loads embeddings from a file or returns an empty dictionary if the file doesn't exist.
+        The embedding matrix is memory-mapped: rows are only read from disk when they are accessed,
+        and the pages are shared between the processes loading the same file.
 
         Args:
             path (str): Path to the embeddings file.
 
         Returns:
-            dict: Loaded embeddings or an empty dictionary.
+            Mapping: Loaded embeddings (as an `EmbeddingTable`) or an empty dictionary.
+
+        Raises:
+            ValueError: If the file was saved in the former pickled dictionary format.
+        """
+        if not os.path.exists(path):
+            return {}
+        if not os.path.exists(self._ids_path(path)):
+            raise ValueError(f"{path} is in the former pickled format: convert it once with "
+                             f"`convert_legacy_embeddings({path!r})`, or regenerate it")
+        return EmbeddingTable(np.load(self._ids_path(path)), np.load(path, mmap_mode='r'))
+
+    def convert_legacy_embeddings(self, path) -> None:
         """
-        if os.path.exists(path):
-            return np.load(path, allow_pickle=True).item()
-        return {}
+        Converts, in place, an embeddings file saved as a pickled dictionary by former versions
+        to the current matrix and IDs files.
+
+        Only convert files you created yourself: reading the former format unpickles them.
+
+        Args:
+            path (str): Path to the embeddings file.
+        """
+        embeddings = np.load(path, allow_pickle=True).item()
+        self.save_embeddings(embeddings, path)
 
     def save_embeddings(self, embeddings, path):
         """
-        Saves embeddings to a file.
+        Saves embeddings as a contiguous float32 matrix, with the IDs in a sidecar file, both sorted by ID.
 
         Args:
-            embeddings (dict): Embeddings to save.
+            embeddings (dict): Embeddings to save. IDs must be strings or numbers.
             path (str): Path to the output file.
+
+        Raises:
+            ValueError: If the IDs can't be stored without pickling.
         """
-        np.save(path, embeddings)
+        if not embeddings:
+            ids, embs = np.empty(0, dtype='U1'), np.empty((0, 0), dtype=np.float32)
+        else:
+            ids = np.asarray(list(embeddings.keys()))
+            if ids.dtype == object:
+                raise ValueError('Embedding IDs must be strings or numbers to be saved locally')
+            embs = np.stack(list(embeddings.values())).astype(np.float32)
+            order = np.argsort(ids, kind='stable')
+            ids, embs = ids[order], np.ascontiguousarray(embs[order])
+        np.save(self._ids_path(path), ids, allow_pickle=False)
+        np.save(path, embs, allow_pickle=False)
+
+    @staticmethod
+    def _ids_path(path: str) -> str:
+        """Returns the path of the file holding the IDs of the embeddings saved at `path`."""
+        return os.path.splitext(path)[0] + '_ids.npy'
 
 
 class integrated_embedder(embedder):
@@ -140,19 +572,19 @@ class integrated_embedder(embedder):
 class watif_embedder(object):
     """Abstract class defining methods to retrieve specific entity embeddings."""
 
-    def get_user_embeddings(self, *args, **kwargs) -> dict:
+    def get_user_embeddings(self, *args, **kwargs) -> Mapping:
         raise NotImplementedError('Must be implemented in subclass / child class.')
 
-    def get_post_embeddings(self, *args, **kwargs) -> dict:
+    def get_post_embeddings(self, *args, **kwargs) -> Mapping:
         raise NotImplementedError('Must be implemented in subclass / child class.')
 
-    def get_thread_embeddings(self, *args, **kwargs) -> dict:
+    def get_thread_embeddings(self, *args, **kwargs) -> Mapping:
         raise NotImplementedError('Must be implemented in subclass / child class.')
 
-    def get_interest_embeddings(self, *args, **kwargs) -> dict:
+    def get_interest_embeddings(self, *args, **kwargs) -> Mapping:
         raise NotImplementedError('Must be implemented in subclass / child class.')
 
-    def get_key_embeddings(self, *args, **kwargs) -> dict:
+    def get_key_embeddings(self, *args, **kwargs) -> Mapping:
         raise NotImplementedError('Must be implemented in subclass / child class.')
 
     def get_user_embedding(self, id_user: str | int | bytes, *args, **kwargs) -> np.ndarray:
@@ -224,12 +656,35 @@ class MC_embedder(watif_integrated_embedder):
         get_key_embeddings(*args, **kwargs):
             Retrieves embeddings for all keys in the database.
 
-        _get_embedding(entity_type, entity_id):
-            Retrieves the embedding for a specific entity from the database.
+        refresh_embeddings():
+            Recomputes and stores every missing, expired or stale embedding.
+
+        start_refresh(interval_minutes):
+            Runs `refresh_embeddings` periodically on a background thread.
+
+        get_table(collection):
+            Returns the in-memory embeddings of a collection, without computing any.
 
-        encode(entity_type, entity_id, show_progress_bar=True, *args, **kwargs):
+        encode(entity_type, entity_id, show_progress_bar=False, *args, **kwargs):
             Encodes an entity based on its type and ID, with configurable arguments and weights for generating embeddings.
     """
+    # Maximum number of entities embedded concurrently by `_get_embeddings`
+    _MAX_WORKERS = 8
+    # Number of documents per batch when streaming stored embedding vectors
+    _CURSOR_BATCH_SIZE = 4096
+    # Maximum number of IDs per `$in` query
+    _IN_BATCH_SIZE = 5000
+    # Document fields each embedding is computed from
+    _EMBEDDING_INPUTS = {
+        'keys': ('name',),
+        'interests': ('name',),
+        'users': ('interests', 'follow', 'description'),
+        'posts': ('keys', 'title', 'content', 'id_author'),
+        'threads': ('name', 'members', 'id_owner'),
+    }
+    # Collections embedded from their own text only: their embeddings never expire while their inputs are unchanged
+    _CONTENT_EMBEDDINGS = frozenset({'keys', 'interests'})
+
     def __init__(self, db: Database, update_time_hours: int = 2, model: str = 'all-MiniLM-L6-v2', logger: logging.Logger = None, *args, **kwargs) -> None:
         """
         Initializes the MC embedder with database access, the amount of hours before update the embedding and the logger.
@@ -249,13 +704,33 @@ class MC_embedder(watif_integrated_embedder):
         try:
             super().__init__(db, model, *args, **kwargs)
             self.update_time = timedelta(hours=update_time_hours)
-            # Thread-local storage for tracking processing users
-            self._thread_local = local()
             # Lock for database operations
             self._db_lock = Lock()
+            # Collection -> (table of its stored embeddings, date of each embedding), kept between bulk calls
+            self._tables = {}
+            # Guards the read-modify-write of `_tables`, done by the refresh thread and request threads alike
+            self._tables_lock = Lock()
+            # Stop event of the refresh thread, once `start_refresh` has started it
+            self._refresh_stopped = None
+            self._refresh_lock = Lock()
+            # Entity type -> embedding method tables used by `encode`
+            self._entity_dispatch = {
+                'key': self.get_key_embedding,
+                'interest': self.get_interest_embedding,
+                'user': self.get_user_embedding,
+                'post': self.get_post_embedding,
+                'thread': self.get_thread_embedding,
+            }
+            self._bulk_dispatch = {
+                'keys': self.get_key_embeddings,
+                'interests': self.get_interest_embeddings,
+                'users': self.get_user_embeddings,
+                'posts': self.get_post_embeddings,
+                'threads': self.get_thread_embeddings,
+            }
             
             self.logger.info("Successfully initialized MC_embedder instance")
-            self.logger.debug("Database connection established, thread-local storage and locks initialized")
+            self.logger.debug("Database connection established and locks initialized")
         except Exception as e:
             self.logger.error("Failed to initialize MC_embedder: %s", str(e), exc_info=True)
             raise
@@ -273,58 +748,21 @@ class MC_embedder(watif_integrated_embedder):
             logger.setLevel(logging.INFO)
         return logger
 
-    @property
-    def _processing_users(self):
-        """Thread-local set of users being processed."""
-        if not hasattr(self._thread_local, 'processing_users'):
-            self._thread_local.processing_users = set()
-            self.logger.debug("[Thread %s] Initialized processing_users set", 
-                            current_thread().name)
-        return self._thread_local.processing_users
-
-    @contextmanager
-    def _track_user_processing(self, id_user):
-        """
-        Thread-safe context manager for tracking user processing state.
-        
-        Args:
-            id_user: The ID of the user being processed
-            
-        Yields:
-            bool: True if this is a cyclic reference, False otherwise
-        """
-        thread_name = current_thread().name
-        start_time = perf_counter()
-        is_cycle = id_user in self._processing_users
-        
-        self.logger.debug(  "[Thread %s] Beginning user tracking for %s (cycle detected: %s)", 
-                            thread_name, id_user, is_cycle)
-        
-        if not is_cycle:
-            self._processing_users.add(id_user)
-            
-        try:
-            yield is_cycle
-        finally:
-            if not is_cycle:
-                self._processing_users.remove(id_user)
-                duration = perf_counter() - start_time
-                self.logger.debug("[Thread %s] Completed user tracking for %s in %.2f seconds", 
-                                thread_name, id_user, duration)
-
     def get_user_embedding( self, id_user: str | int | bytes, follow_weight: float = 0.4, 
                             interest_weight: float = 0.4, description_weight: float = 0.2, 
-                            *args, **kwargs) -> np.ndarray:
+                            depth: int = 1, *args, **kwargs) -> np.ndarray:
         """
         Thread-safe method to generate a weighted user embedding based on interests, followings, and description.
-        Handles circular dependencies in the social graph by detecting cycles and falling back
-        to a base embedding when needed.
+        The follow graph is walked breadth-first up to `depth` hops with a visited set, so follow
+        cycles are harmless and the work is bounded by the size of that neighbourhood.
 
         Args:
             id_user (str | int | bytes): User ID.
             follow_weight (float): Weight for followings.
             interest_weight (float): Weight for interests.
             description_weight (float): Weight for description.
+            depth (int): Number of follow hops taken into account; followees at the last hop
+                contribute their base (interests + description) embedding.
             *args: Additional arguments.
             **kwargs: Additional keyword arguments.
 
@@ -341,74 +779,66 @@ class MC_embedder(watif_integrated_embedder):
                         thread_name, id_user)
         
         try:
-            # Check if user exists and get current embedding
+            # Get user data and its current embedding
             with self._db_lock:
                 self.logger.debug("[Thread %s] Acquiring database lock for user %s", 
                                 thread_name, id_user)
-                entity = self._get_embedding('users', id_user)
-                if not entity:
-                    self.logger.error("[Thread %s] User %s not found in database", 
-                                    thread_name, id_user)
-                    raise ValueError(f"User {id_user} doesn't exist: impossible to generate an embedding")
-                
-                # Return cached embedding if valid
-                if "embedding" in entity:
-                    embed_date = datetime.fromisoformat(entity['embedding']['date'])
-                    if (datetime.now() - embed_date) < self.update_time:
-                        self.logger.info("[Thread %s] Retrieved valid cached embedding for user %s", 
-                                        thread_name, id_user)
-                        return np.array(entity["embedding"]['vector'])
-                    else:
-                        self.logger.debug("[Thread %s] Cached embedding expired for user %s", 
-                                        thread_name, id_user)
+                user = self._fetch_entity('users', id_user, self._EMBEDDING_INPUTS['users'])
+            if not user:
+                self.logger.error("[Thread %s] User %s not found in database", 
+                                thread_name, id_user)
+                raise ValueError(f"User {id_user} doesn't exist: impossible to generate an embedding")
+            
+            # Return cached embedding if valid
+            cached = self._cached_vector('users', user)
+            if cached is not None:
+                self.logger.info("[Thread %s] Retrieved valid cached embedding for user %s", 
+                                thread_name, id_user)
+                return cached
+            self.logger.debug("[Thread %s] No valid cached embedding for user %s", 
+                            thread_name, id_user)
             
             # Validate weights
-            if not np.isclose(follow_weight + interest_weight + description_weight, 1.0, rtol=1e-09, atol=1e-09):
+            if not math.isclose(follow_weight + interest_weight + description_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
                 self.logger.error("[Thread %s] Invalid weights for user %s: follow=%.2f, interest=%.2f, description=%.2f", 
                                 thread_name, id_user, follow_weight, interest_weight, description_weight)
                 raise ValueError('The sum of arguments follow_weight, interest_weight and description_weight must be 1.0')
             
-            # Get user data
-            with self._db_lock:
-                self.logger.debug("[Thread %s] Retrieving user data for %s", 
-                                thread_name, id_user)
-                user = self.db.mongo_db['users'].find_one({"_id": id_user})
-            
-            # Process user embedding with cycle detection
-            with self._track_user_processing(id_user) as is_cycle:
-                if is_cycle:
-                    self.logger.info("[Thread %s] Generating base embedding for user %s due to circular dependency", 
-                                    thread_name, id_user)
-                    return self._generate_base_user_embedding(
-                        user, 
-                        interest_weight/(interest_weight + description_weight),
-                        description_weight/(interest_weight + description_weight),
-                        *args, **kwargs
-                    )
-                
-                self.logger.debug("[Thread %s] Generating full embedding for user %s", 
-                                thread_name, id_user)
-                embedded_user = self._generate_full_user_embedding(
-                    user, follow_weight, interest_weight, description_weight,
-                    *args, **kwargs
-                )
-                
-                # Store the embedding
-                with self._db_lock:
-                    self.logger.debug("[Thread %s] Storing new embedding for user %s", 
-                                    thread_name, id_user)
-                    self.db.mongo_db['users'].update_one(
-                        {'_id': id_user},
-                        {'$set': {
-                            'embedding': {
-                                'date': datetime.now().isoformat(),
-                                'vector': embedded_user.tolist()
-                            }
-                        }}
-                    )
-                
-                return embedded_user
-                
+            # Breadth-first walk of the follow graph, one query per level; followees with a
+            # valid cached embedding are used as-is and not expanded further
+            users, known = {id_user: user}, {}
+            frontier = set(user.get('follow', []))
+            for level in range(depth):
+                frontier -= users.keys() | known.keys()
+                if not frontier:
+                    break
+                self.logger.debug("[Thread %s] Fetching %d followees at depth %d for user %s", 
+                                thread_name, len(frontier), level + 1, id_user)
+                next_frontier = set()
+                for followee in self.db.mongo_db['users'].find(
+                        {'_id': {'$in': list(frontier)}},
+                        {'_id': 1, 'embedding': 1, 'description': 1, 'interests': 1, 'follow': 1}):
+                    cached_followee = self._cached_vector('users', followee)
+                    if cached_followee is not None:
+                        known[followee['_id']] = cached_followee
+                    else:
+                        users[followee['_id']] = followee
+                        next_frontier.update(followee.get('follow', []))
+                frontier = next_frontier
+
+            interests = self.get_interest_embeddings(list({i for u in users.values() for i in u.get('interests', [])}))
+            embedded_user = self._compose_user_embeddings(
+                users, interests, EmbeddingTable.from_dict(known), depth,
+                follow_weight, interest_weight, description_weight
+            )[id_user]
+
+            # Store the embedding
+            self.logger.debug("[Thread %s] Storing new embedding for user %s", 
+                            thread_name, id_user)
+            self._store_embeddings('users', {id_user: embedded_user}, {id_user: user})
+
+            return embedded_user
+
         except Exception as e:
             self.logger.error("[Thread %s] Error generating embedding for user %s: %s", 
                             thread_name, id_user, str(e), exc_info=True)
@@ -418,111 +848,40 @@ class MC_embedder(watif_integrated_embedder):
             self.logger.info(   "[Thread %s] Completed embedding generation for user %s in %.2f seconds", 
                                 thread_name, id_user, duration)
     
-    def _generate_base_user_embedding(  self, user: dict, normalized_interest_weight: float,
-                                        normalized_description_weight: float, *args, **kwargs) -> np.ndarray:
-        """
-        Generates a base user embedding without follow relationships to break circular dependencies.
-        Thread-safe as it doesn't modify shared state.
-        
-        Args:
-            user (dict): User document from database.
-            normalized_interest_weight (float): Adjusted weight for interests.
-            normalized_description_weight (float): Adjusted weight for description.
-            *args: Additional arguments.
-            **kwargs: Additional keyword arguments.
-            
-        Returns:
-            np.ndarray: Base user embedding.
-        """
-        thread_name = current_thread().name
-        start_time = perf_counter()
-        
-        self.logger.debug(  "[Thread %s] Generating base embedding for user %s with %d interests", 
-                            thread_name, user['_id'], len(user['interests']))
-        
-        try:
-            result = Utils.array_avg(
-                Utils.array_avg(
-                    self.get_interest_embedding(
-                        id_interest,
-                        *args, **kwargs
-                    )
-                    for id_interest in user['interests']
-                ) * normalized_interest_weight,
-                self.model.encode(
-                    user['description'],
-                    *args, **kwargs
-                ) * normalized_description_weight
-            )
-            
-            duration = perf_counter() - start_time
-            self.logger.debug("[Thread %s] Generated base embedding for user %s in %.2f seconds", 
-                            thread_name, user['_id'], duration)
-            return result
-            
-        except Exception as e:
-            self.logger.error("[Thread %s] Error generating base embedding for user %s: %s", 
-                            thread_name, user['_id'], str(e), exc_info=True)
-            raise
-    
-    def _generate_full_user_embedding(self, user: dict, follow_weight: float,
-                                    interest_weight: float, description_weight: float,
-                                    *args, **kwargs) -> np.ndarray:
+    def _compose_user_embeddings(self, users: dict, interests: Mapping, known: Mapping, depth: int,
+                                follow_weight: float, interest_weight: float, description_weight: float) -> dict:
         """
-        Generates a complete user embedding including follow relationships.
-        Thread-safe as it doesn't modify shared state.
-        
+        Computes the embeddings of a set of users, following the follow graph up to `depth` hops.
+
+        Every user starts from its base (interests + description) embedding; each of the `depth` passes
+        then mixes in the mean of the previous pass' followee embeddings. Followees in `known` keep their
+        given embedding and followees outside `users` and `known` are ignored, so no recursion is involved.
+
         Args:
-            user (dict): User document from database.
+            users (dict): User documents to embed, by user ID.
+            interests (Mapping): Interest embeddings, by interest ID.
+            known (EmbeddingTable): Already computed embeddings of other users, by user ID.
+            depth (int): Number of follow hops taken into account.
             follow_weight (float): Weight for followings.
             interest_weight (float): Weight for interests.
             description_weight (float): Weight for description.
-            *args: Additional arguments.
-            **kwargs: Additional keyword arguments.
-            
+
         Returns:
-            np.ndarray: Complete user embedding.
+            dict: The embeddings of `users`, by user ID.
         """
-        thread_name = current_thread().name
-        start_time = perf_counter()
-        
-        self.logger.debug(  "[Thread %s] Generating full embedding for user %s with %d interests and %d follows", 
-                            thread_name, user['_id'], len(user['interests']), len(user['follow']))
-        
-        try:
-            result = Utils.array_avg(
-                Utils.array_avg(
-                    self.get_interest_embedding(
-                        id_interest,
-                        *args, **kwargs
-                    )
-                    for id_interest in user['interests']
-                ) * interest_weight,
-                self.model.encode(
-                    user['description'],
-                    *args, **kwargs
-                ) * description_weight,
-                Utils.array_avg(
-                    self.get_user_embedding(
-                        id_follow,
-                        follow_weight=follow_weight,
-                        interest_weight=interest_weight,
-                        description_weight=description_weight,
-                        *args, **kwargs
-                    )
-                    for id_follow in user['follow']
-                ) * follow_weight
-            )
-            
-            duration = perf_counter() - start_time
-            self.logger.debug("[Thread %s] Generated full embedding for user %s in %.2f seconds", 
-                            thread_name, user['_id'], duration)
-            return result
-            
-        except Exception as e:
-            self.logger.error("[Thread %s] Error generating full embedding for user %s: %s", 
-                            thread_name, user['_id'], str(e), exc_info=True)
-            raise
+        ids = list(users)
+        descriptions = self._encode_batch([user['description'] for user in users.values()])
+        dim = descriptions.shape[1]
+        base = description_weight * descriptions + interest_weight * _group_means(
+            interests, [user.get('interests', []) for user in users.values()], dim)
+
+        # Each pass mixes in the mean of the followees' embeddings from the previous pass
+        follows = [user.get('follow', []) for user in users.values()]
+        vectors = _normalize(base)
+        for _ in range(depth):
+            table = EmbeddingTable.from_dict(dict(zip(ids, vectors))).updated(known)
+            vectors = _normalize(base + follow_weight * _group_means(table, follows, dim))
+        return dict(zip(ids, vectors))
 
     def get_post_embedding(self, id_post: str | int | bytes, key_weight: float = 0.35, title_weight: float = 0.35, content_weight: float = 0.2, author_weight: float = 0.1, *args, **kwargs) -> np.ndarray:
         """
@@ -553,72 +912,48 @@ class MC_embedder(watif_integrated_embedder):
         try:
             with self._db_lock:
                 self.logger.debug("[Thread %s] Acquiring database lock for post %s", thread_name, id_post)
-                entity = self._get_embedding('posts', id_post)
-                
-                if not entity:
-                    self.logger.error("[Thread %s] Post %s not found in database", thread_name, id_post)
-                    raise ValueError(f"Post {id_post} doesn't exist: impossible to generate an embedding")
-                
-                # Return cached embedding if it exists and is fresh
-                if "embedding" in entity:
-                    embed_date = datetime.fromisoformat(entity['embedding']['date'])
-                    age = datetime.now() - embed_date
-                    self.logger.debug("[Thread %s] Found existing embedding for post %s (age: %s)", 
-                                    thread_name, id_post, age)
-                    if age < self.update_time:
-                        self.logger.info("[Thread %s] Using cached embedding for post %s", thread_name, id_post)
-                        return np.array(entity["embedding"]['vector'])
-                    self.logger.debug("[Thread %s] Cached embedding expired for post %s", thread_name, id_post)
+                post = self._fetch_entity('posts', id_post, self._EMBEDDING_INPUTS['posts'])
+            
+            if not post:
+                self.logger.error("[Thread %s] Post %s not found in database", thread_name, id_post)
+                raise ValueError(f"Post {id_post} doesn't exist: impossible to generate an embedding")
+            
+            # Return cached embedding if it exists, is fresh and its inputs didn't change
+            cached = self._cached_vector('posts', post)
+            if cached is not None:
+                self.logger.info("[Thread %s] Using cached embedding for post %s", thread_name, id_post)
+                return cached
             
             weights_sum = key_weight + title_weight + content_weight + author_weight
-            if not np.isclose(weights_sum, 1.0, rtol=1e-09, atol=1e-09):
+            if not math.isclose(weights_sum, 1.0, rel_tol=1e-09, abs_tol=1e-09):
                 self.logger.error("[Thread %s] Invalid weights sum for post %s: %.3f", 
                                 thread_name, id_post, weights_sum)
                 raise ValueError('The sum of weights must be 1.0')
             
-            with self._db_lock:
-                self.logger.debug("[Thread %s] Retrieving post data for %s", thread_name, id_post)
-                post = self.db.mongo_db['posts'].find_one({"_id": id_post})
-                self.logger.debug("[Thread %s] Found post %s with %d keys", 
-                                thread_name, id_post, len(post['keys']))
+            self.logger.debug("[Thread %s] Found post %s with %d keys", 
+                            thread_name, id_post, len(post['keys']))
             
             self.logger.debug("[Thread %s] Generating embeddings for post components", thread_name)
-            embedded_post = Utils.array_avg(
-                Utils.array_avg(
-                    self.get_key_embedding(
-                        id_key, 
-                        *args, **kwargs
-                    )
-                    for id_key in post['keys']
-                ) * key_weight,
-                self.model.encode(
-                    sentences = post['title'],
-                    prompt = 'Titre:\n',
-                    *args, **kwargs
-                ) * title_weight,
-                self.model.encode(
-                    sentences = post['content'],
-                    prompt = 'Content:\n',
-                    *args, **kwargs
-                ) * content_weight,
+            embedded_title, embedded_content = self._encode_sentences(
+                self._prompted('title', [post.get('title') or '']) + self._prompted('content', [post.get('content') or '']))
+            keys = self.get_key_embeddings(post['keys'])
+            # Keys missing from the database are ignored, as in `get_post_embeddings`
+            embedded_post = _normalize(_weighted_mix(np.stack([
+                Utils.stack_mean(
+                    (keys[id_key] for id_key in post['keys'] if id_key in keys),
+                    self.model.get_sentence_embedding_dimension()
+                ),
+                embedded_title,
+                embedded_content,
                 self.get_user_embedding(
                     post['id_author'],
                     *args, **kwargs
-                ) * author_weight
-            )
+                )
+            ]), np.array([key_weight, title_weight, content_weight, author_weight])))
             
             # Store the embedding in the database
-            with self._db_lock:
-                self.logger.debug("[Thread %s] Storing new embedding for post %s", thread_name, id_post)
-                self.db.mongo_db['posts'].update_one(
-                    {'_id': id_post},
-                    {'$set': {
-                        'embedding': {
-                            'date': datetime.now().isoformat(),
-                            'vector': embedded_post.tolist()
-                        }
-                    }}
-                )
+            self.logger.debug("[Thread %s] Storing new embedding for post %s", thread_name, id_post)
+            self._store_embeddings('posts', {id_post: embedded_post}, {id_post: post})
             
             return embedded_post
             
@@ -658,68 +993,51 @@ class MC_embedder(watif_integrated_embedder):
                             thread_name, author_weight, name_weight, member_weight, post_weight)
         
         try:
-            entity = self._get_embedding('threads', id_thread)
+            thread = self._fetch_entity('threads', id_thread, self._EMBEDDING_INPUTS['threads'])
             
-            if not entity:
+            if not thread:
                 self.logger.error("[Thread %s] Thread %s not found in database", thread_name, id_thread)
                 raise ValueError(f"Thread {id_thread} doesn't exist: impossible to generate an embedding")
             
-            # Return cached embedding if it exists and is fresh
-            if "embedding" in entity:
-                embed_date = datetime.fromisoformat(entity['embedding']['date'])
-                age = datetime.now() - embed_date
-                self.logger.debug("[Thread %s] Found existing embedding for thread %s (age: %s)",
-                                thread_name, id_thread, age)
-                if age < self.update_time:
-                    return np.array(entity["embedding"]['vector'])
+            # Return cached embedding if it exists, is fresh and its inputs didn't change
+            cached = self._cached_vector('threads', thread)
+            if cached is not None:
+                return cached
             
             weights_sum = author_weight + name_weight + member_weight + post_weight
-            if not np.isclose(weights_sum, 1.0, rtol=1e-09, atol=1e-09):
+            if not math.isclose(weights_sum, 1.0, rel_tol=1e-09, abs_tol=1e-09):
                 self.logger.error("[Thread %s] Invalid weights sum for thread %s: %.3f",
                                 thread_name, id_thread, weights_sum)
                 raise ValueError('The sum of weights must be 1.0')
             
-            self.logger.debug("[Thread %s] Retrieving thread data and generating embeddings", thread_name)
-            thread = self.db.mongo_db['threads'].find_one({"_id": id_thread})
-            
-            embedded_thread = Utils.array_avg(
+            self.logger.debug("[Thread %s] Generating embeddings for thread components", thread_name)
+            embedded_thread = _normalize(_weighted_mix(np.stack([
                 self.get_user_embedding(
-                    thread['id_author'], 
-                    *args, **kwargs
-                ) * author_weight,
-                self.model.encode(
-                    sentences = thread['name'],
-                    prompt = 'Discussion name:\n',
+                    thread['id_owner'],
                     *args, **kwargs
-                ) * name_weight,
-                Utils.array_avg(
-                    self.get_user_embedding(
-                        id_member,
-                        *args, **kwargs
-                    )
-                    for id_member in thread['members']
-                ) * member_weight,
-                Utils.array_avg(
-                    self.get_post_embedding(
-                        post['idPost'],
-                        *args, **kwargs
-                    )
-                    for post in self.db.mongo_db['posts'].find({"id_thread": id_thread})
-                ) * post_weight
-            )
+                ),
+                self._encode_sentence(thread['name'], prompt_name='thread'),
+                Utils.stack_mean(
+                    self._get_embeddings(
+                        'users',
+                        {'_id': {'$in': thread['members']}},
+                        lambda id_member: self.get_user_embedding(id_member, *args, **kwargs)
+                    ).values(),
+                    self.model.get_sentence_embedding_dimension()
+                ),
+                Utils.stack_mean(
+                    self._get_embeddings(
+                        'posts',
+                        {'id_thread': id_thread},
+                        lambda id_post: self.get_post_embedding(id_post, *args, **kwargs)
+                    ).values(),
+                    self.model.get_sentence_embedding_dimension()
+                )
+            ]), np.array([author_weight, name_weight, member_weight, post_weight])))
             
             # Store the embedding in the database
-            with self._db_lock:
-                self.logger.debug("[Thread %s] Storing new embedding for thread %s", thread_name, id_thread)
-                self.db.mongo_db['threads'].update_one(
-                    {'_id': id_thread},
-                    {'$set': {
-                        'embedding': {
-                            'date': datetime.now().isoformat(),
-                            'vector': embedded_thread.tolist()
-                        }
-                    }}
-                )
+            self.logger.debug("[Thread %s] Storing new embedding for thread %s", thread_name, id_thread)
+            self._store_embeddings('threads', {id_thread: embedded_thread}, {id_thread: thread})
             
             return embedded_thread
             
@@ -750,36 +1068,24 @@ class MC_embedder(watif_integrated_embedder):
         self.logger.info("[Thread %s] Starting key embedding generation for %s", thread_name, id_key)
         
         try:
-            entity = self._get_embedding('keys', id_key)
+            entity = self._fetch_entity('keys', id_key, self._EMBEDDING_INPUTS['keys'])
             
             if not entity:
                 self.logger.error("[Thread %s] Key %s not found in database", thread_name, id_key)
                 raise ValueError(f"Key {id_key} doesn't exist: impossible to generate an embedding")
             
             # Return cached embedding if it exists and is fresh
-            if "embedding" in entity:
-                embed_date = datetime.fromisoformat(entity['embedding']['date'])
-                age = datetime.now() - embed_date
-                self.logger.debug("[Thread %s] Found existing embedding for key %s (age: %s)",
-                                thread_name, id_key, age)
-                if age < self.update_time:
-                    return np.array(entity["embedding"]['vector'])
+            cached = self._cached_vector('keys', entity)
+            if cached is not None:
+                self.logger.debug("[Thread %s] Using cached embedding for key %s", thread_name, id_key)
+                return cached
             
             self.logger.debug("[Thread %s] Generating new embedding for key %s", thread_name, id_key)
-            embedded_key = self.model.encode(entity['name'], *args, **kwargs)
+            embedded_key = self._encode_sentence(entity['name'])
             
             # Store the embedding in the database
-            with self._db_lock:
-                self.logger.debug("[Thread %s] Storing new embedding for key %s", thread_name, id_key)
-                self.db.mongo_db['keys'].update_one(
-                    {'_id': id_key},
-                    {'$set': {
-                        'embedding': {
-                            'date': datetime.now().isoformat(),
-                            'vector': embedded_key.tolist()
-                        }
-                    }}
-                )
+            self.logger.debug("[Thread %s] Storing new embedding for key %s", thread_name, id_key)
+            self._store_embeddings('keys', {id_key: embedded_key}, {id_key: entity})
             
             return embedded_key
             
@@ -812,53 +1118,31 @@ class MC_embedder(watif_integrated_embedder):
         try:
             with self._db_lock:
                 self.logger.debug("[Thread %s] Acquiring database lock for interest %s", thread_name, id_interest)
-                entity = self._get_embedding('interest', id_interest)
-                
-                if not entity:
-                    self.logger.error("[Thread %s] Interest %s not found in database", thread_name, id_interest)
-                    raise ValueError(f"Interest {id_interest} doesn't exist: impossible to generate an embedding")
-                
-                self.logger.debug("[Thread %s] Retrieved interest data: %s (name length: %d)", 
-                                thread_name, id_interest, len(entity['name']))
-                
-                # Check for cached embedding
-                if "embedding" in entity:
-                    embed_date = datetime.fromisoformat(entity['embedding']['date'])
-                    age = datetime.now() - embed_date
-                    self.logger.debug("[Thread %s] Found existing embedding for interest %s (age: %s)", 
-                                    thread_name, id_interest, age)
-                    
-                    if age < self.update_time:
-                        self.logger.info("[Thread %s] Using cached embedding for interest %s (age: %s < threshold: %s)", 
-                                        thread_name, id_interest, age, self.update_time)
-                        cached_vector = np.array(entity["embedding"]['vector'])
-                        self.logger.debug("[Thread %s] Retrieved cached embedding for interest %s (shape: %s)", 
-                                        thread_name, id_interest, cached_vector.shape)
-                        return cached_vector
-                    
-                    self.logger.debug("[Thread %s] Cached embedding expired for interest %s (age: %s >= threshold: %s)", 
-                                    thread_name, id_interest, age, self.update_time)
+                entity = self._fetch_entity('interests', id_interest, self._EMBEDDING_INPUTS['interests'])
+            
+            if not entity:
+                self.logger.error("[Thread %s] Interest %s not found in database", thread_name, id_interest)
+                raise ValueError(f"Interest {id_interest} doesn't exist: impossible to generate an embedding")
             
+            self.logger.debug("[Thread %s] Retrieved interest data: %s (name length: %d)", 
+                            thread_name, id_interest, len(entity['name']))
+            
+            # Check for cached embedding
+            cached_vector = self._cached_vector('interests', entity)
+            if cached_vector is not None:
+                self.logger.info("[Thread %s] Using cached embedding for interest %s", thread_name, id_interest)
+                return cached_vector
+            
+
             self.logger.debug(  "[Thread %s] Generating new embedding for interest %s using model", 
                                 thread_name, id_interest)
-            embedded_interest = self.model.encode(entity['name'], *args, **kwargs)
+            embedded_interest = self._encode_sentence(entity['name'])
             self.logger.debug(  "[Thread %s] Generated embedding for interest %s (shape: %s)", 
                                 thread_name, id_interest, embedded_interest.shape)
             
             # Store the embedding in the database
-            with self._db_lock:
-                self.logger.debug("[Thread %s] Storing new embedding for interest %s", thread_name, id_interest)
-                update_result = self.db.mongo_db['interest'].update_one(
-                    {'_id': id_interest},
-                    {'$set': {
-                        'embedding': {
-                            'date': datetime.now().isoformat(),
-                            'vector': embedded_interest.tolist()
-                        }
-                    }}
-                )
-                self.logger.debug(  "[Thread %s] Database update for interest %s completed (modified: %s)", 
-                                    thread_name, id_interest, update_result.modified_count > 0)
+            self.logger.debug("[Thread %s] Storing new embedding for interest %s", thread_name, id_interest)
+            self._store_embeddings('interests', {id_interest: embedded_interest}, {id_interest: entity})
             
             return embedded_interest
             
@@ -871,96 +1155,531 @@ class MC_embedder(watif_integrated_embedder):
             self.logger.info("[Thread %s] Completed interest embedding generation for %s in %.2f seconds", 
                             thread_name, id_interest, duration)
 
-    def get_user_embeddings(self, *args, **kwargs) -> dict:
+    def get_user_embeddings(self, follow_weight: float = 0.4, interest_weight: float = 0.4,
+                            description_weight: float = 0.2, depth: int = 1, *args, **kwargs) -> EmbeddingTable:
         """
         Retrieves embeddings for all users in the database.
 
+        The users collection is scanned once; fresh cached embeddings are reused and every missing
+        description is encoded in a single batched call. Follow relationships are taken into account
+        up to `depth` hops, as in `get_user_embedding`.
+
         Args:
-            *args: Additional arguments to pass to the embedding generation process.
-            **kwargs: Additional keyword arguments for embedding generation.
+            follow_weight (float): Weight for followings.
+            interest_weight (float): Weight for interests.
+            description_weight (float): Weight for description.
+            depth (int): Number of follow hops taken into account.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
 
         Returns:
-            dict: A dictionary with user IDs as keys and their embeddings (np.ndarray) as values.
-        """
-        return {user:
-                self.get_user_embeddings(user, *args, **kwargs)
-                for user in self.db.mongo_db['users'].find(projection={'_id': 1})}
+            EmbeddingTable: The embeddings of all users, by user ID.
 
-    def get_post_embeddings(self, *args, **kwargs) -> dict:
+        Raises:
+            ValueError: If the sum of weights is not equal to 1.
+        """
+        if not math.isclose(follow_weight + interest_weight + description_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
+            raise ValueError('The sum of arguments follow_weight, interest_weight and description_weight must be 1.0')
+
+        users = {user['_id']: user for user in self.db.mongo_db['users'].find(
+            {}, {'_id': 1, 'embedding.date': 1, 'embedding.hash': 1, 'description': 1, 'interests': 1, 'follow': 1})}
+        vectors = self._cached_table('users', users.values())
+        missing = {id_user: users[id_user] for id_user in self._not_in(vectors, users)}
+        if not missing:
+            return vectors
+
+        self.logger.info("Generating embeddings for %d users", len(missing))
+        fresh = self._compose_user_embeddings(
+            missing, self.get_interest_embeddings(), vectors, depth,
+            follow_weight, interest_weight, description_weight
+        )
+
+        return self._extend_table('users', fresh, self._store_embeddings('users', fresh, users))
+
+    def get_post_embeddings(self, key_weight: float = 0.35, title_weight: float = 0.35, content_weight: float = 0.2,
+                            author_weight: float = 0.1, *args, **kwargs) -> EmbeddingTable:
         """
         Retrieves embeddings for all posts in the database.
 
+        The posts collection is scanned once and the titles and contents of every post to embed are encoded
+        in a single batched call.
+
         Args:
-            *args: Additional arguments to pass to the embedding generation process.
-            **kwargs: Additional keyword arguments for embedding generation.
+            key_weight (float): Weight for keys associated with the post.
+            title_weight (float): Weight for the title of the post.
+            content_weight (float): Weight for the content of the post.
+            author_weight (float): Weight for the author of the post.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
 
         Returns:
-            dict: A dictionary with post IDs as keys and their embeddings (np.ndarray) as values.
-        """
-        return {post:
-                self.get_post_embedding(post, *args, **kwargs)
-                for post in self.db.mongo_db['posts'].find(projection={'_id': 1})}
+            EmbeddingTable: The embeddings of all posts, by post ID.
 
-    def get_thread_embeddings(self, *args, **kwargs) -> dict:
+        Raises:
+            ValueError: If the sum of weights is not equal to 1.
+        """
+        if not math.isclose(key_weight + title_weight + content_weight + author_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
+            raise ValueError('The sum of weights must be 1.0')
+
+        posts = {post['_id']: post for post in self.db.mongo_db['posts'].find(
+            {}, {'_id': 1, 'embedding.date': 1, 'embedding.hash': 1, 'title': 1, 'content': 1, 'keys': 1, 'id_author': 1})}
+        vectors = self._cached_table('posts', posts.values())
+        missing = [posts[id_post] for id_post in self._not_in(vectors, posts)]
+        if not missing:
+            return vectors
+
+        self.logger.info("Generating embeddings for %d posts", len(missing))
+        keys = self.get_key_embeddings()
+        authors = self.get_user_embeddings()
+        # An incomplete post (e.g. without a title) is embedded from its other fields rather than failing the batch
+        encoded = self._encode_batch(self._prompted('title', [post.get('title') or '' for post in missing])
+                                     + self._prompted('content', [post.get('content') or '' for post in missing]))
+
+        # Weighted sum of the (N, D) component matrices; missing keys or authors contribute zero rows
+        dim = encoded.shape[1]
+        post_authors = [[post['id_author']] if post.get('id_author') is not None else [] for post in missing]
+        embedded = _normalize(
+            title_weight * encoded[:len(missing)]
+            + content_weight * encoded[len(missing):]
+            + key_weight * _group_means(keys, [post.get('keys', []) for post in missing], dim)
+            + author_weight * _group_means(authors, post_authors, dim)
+        )
+        fresh = dict(zip((post['_id'] for post in missing), embedded))
+
+        return self._extend_table('posts', fresh, self._store_embeddings('posts', fresh, posts))
+
+    def get_thread_embeddings(self, author_weight: float = 0.1, name_weight: float = 0.1, member_weight: float = 0.4,
+                              post_weight: float = 0.4, *args, **kwargs) -> EmbeddingTable:
         """
         Retrieves embeddings for all threads in the database.
 
+        The threads collection is scanned once and the names of every thread to embed are encoded in a
+        single batched call.
+
         Args:
-            *args: Additional arguments to pass to the embedding generation process.
-            **kwargs: Additional keyword arguments for embedding generation.
+            author_weight (float): Weight for the thread's author.
+            name_weight (float): Weight for the thread's name.
+            member_weight (float): Weight for the members of the thread.
+            post_weight (float): Weight for posts in the thread.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
 
         Returns:
-            dict: A dictionary with thread IDs as keys and their embeddings (np.ndarray) as values.
-        """
-        return {post:
-                self.get_post_embedding(post, *args, **kwargs)
-                for post in self.db.mongo_db['threads'].find(projection={'_id': 1})}
+            EmbeddingTable: The embeddings of all threads, by thread ID.
 
-    def get_interest_embeddings(self, *args, **kwargs) -> dict:
+        Raises:
+            ValueError: If the sum of weights is not equal to 1.
+        """
+        if not math.isclose(author_weight + name_weight + member_weight + post_weight, 1.0, rel_tol=1e-09, abs_tol=1e-09):
+            raise ValueError('The sum of weights must be 1.0')
+
+        threads = {thread['_id']: thread for thread in self.db.mongo_db['threads'].find(
+            {}, {'_id': 1, 'embedding.date': 1, 'embedding.hash': 1, 'name': 1, 'members': 1, 'id_owner': 1})}
+        vectors = self._cached_table('threads', threads.values())
+        missing = [threads[id_thread] for id_thread in self._not_in(vectors, threads)]
+        if not missing:
+            return vectors
+
+        self.logger.info("Generating embeddings for %d threads", len(missing))
+        users = self.get_user_embeddings()
+        posts = self.get_post_embeddings()
+        thread_posts = {}
+        for post in self.db.mongo_db['posts'].find({}, {'_id': 1, 'id_thread': 1}):
+            thread_posts.setdefault(post.get('id_thread'), []).append(post['_id'])
+        names = self._encode_batch(self._prompted('thread', [thread['name'] for thread in missing]))
+
+        # Weighted sum of the (N, D) component matrices; missing components contribute zero rows
+        dim = names.shape[1]
+        owners = [[thread['id_owner']] if thread.get('id_owner') is not None else [] for thread in missing]
+        embedded = _normalize(
+            name_weight * names
+            + author_weight * _group_means(users, owners, dim)
+            + member_weight * _group_means(users, [thread.get('members', []) for thread in missing], dim)
+            + post_weight * _group_means(posts, [thread_posts.get(thread['_id'], []) for thread in missing], dim)
+        )
+        fresh = dict(zip((thread['_id'] for thread in missing), embedded))
+
+        return self._extend_table('threads', fresh, self._store_embeddings('threads', fresh, threads))
+
+    def get_interest_embeddings(self, ids: list = None, *args, **kwargs) -> EmbeddingTable:
         """
         Retrieves embeddings for all interests in the database.
 
         Args:
-            *args: Additional arguments to pass to the embedding generation process.
-            **kwargs: Additional keyword arguments for embedding generation.
+            ids (list, optional): Only retrieve the embeddings of these interests, with a single `$in` query.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
 
         Returns:
-            dict: A dictionary with interest IDs as keys and their embeddings (np.ndarray) as values.
+            EmbeddingTable: The embeddings of all interests, by interest ID.
         """
-        return {interest:
-                self.get_interest_embedding(interest, *args, **kwargs)
-                for interest in self.db.mongo_db['interests'].find(projection={'_id': 1})}
+        return self._get_named_embeddings('interests', ids)
 
-    def get_key_embeddings(self, *args, **kwargs) -> dict:
+    def get_key_embeddings(self, ids: list = None, *args, **kwargs) -> EmbeddingTable:
         """
         Retrieves embeddings for all keywords in the database.
 
         Args:
-            *args: Additional arguments to pass to the embedding generation process.
-            **kwargs: Additional keyword arguments for embedding generation.
+            ids (list, optional): Only retrieve the embeddings of these keywords, with a single `$in` query.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            EmbeddingTable: The embeddings of all keywords, by keyword ID.
+        """
+        return self._get_named_embeddings('keys', ids)
+
+    def _get_named_embeddings(self, collection: str, ids: list = None) -> EmbeddingTable:
+        """
+        Retrieves embeddings for all entities of a collection embedded from their name only (keys, interests).
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            ids (list, optional): Only retrieve the embeddings of these entities.
 
         Returns:
-            dict: A dictionary with keyword IDs as keys and their embeddings (np.ndarray) as values.
+            EmbeddingTable: The embeddings of the collection's entities, by entity ID.
+        """
+        if ids is None:
+            entities = {entity['_id']: entity for entity in self.db.mongo_db[collection].find(
+                {}, {'_id': 1, 'embedding.date': 1, 'embedding.hash': 1, 'name': 1})}
+            vectors = self._cached_table(collection, entities.values())
+        else:
+            entities = {entity['_id']: entity for entity in self.db.mongo_db[collection].find(
+                {'_id': {'$in': list(ids)}}, {'_id': 1, 'embedding': 1, 'name': 1})}
+            vectors = EmbeddingTable.from_dict(self._partition_cached(collection, entities.values()))
+        missing = self._not_in(vectors, entities)
+        if not missing:
+            return vectors
+
+        self.logger.info("Generating embeddings for %d %s", len(missing), collection)
+        fresh = dict(zip(missing, self._encode_batch([entities[entity_id]['name'] for entity_id in missing])))
+        date = self._store_embeddings(collection, fresh, entities)
+        return self._extend_table(collection, fresh, date) if ids is None else vectors.updated(fresh)
+
+    def _get_embeddings(self, collection: str, query: dict, compute) -> dict:
+        """
+        Retrieves the embeddings of the entities matching a query, fetched in a single round-trip.
+
+        Valid cached embeddings are taken from the fetched documents; the other entities are embedded with `compute`
+        on a thread pool, so that their MongoDB round-trips and forward passes (which release the GIL) overlap.
+
+        Args:
+            collection (str): Name of the MongoDB collection (users, posts or threads).
+            query (dict): MongoDB filter selecting the entities.
+            compute (Callable): Computes the embedding of an entity from its ID.
+
+        Returns:
+            dict: A dictionary with entity IDs as keys and their embeddings as values.
+        """
+        entities = list(self.db.mongo_db[collection].find(
+            query, {'embedding': 1, **{field: 1 for field in self._EMBEDDING_INPUTS[collection]}}))
+        vectors = self._partition_cached(collection, entities)
+        missing = [entity['_id'] for entity in entities if entity['_id'] not in vectors]
+        if len(missing) == 1:
+            vectors[missing[0]] = compute(missing[0])
+        elif missing:
+            with ThreadPoolExecutor(max_workers=min(self._MAX_WORKERS, len(missing))) as executor:
+                vectors.update(zip(missing, executor.map(compute, missing)))
+        return vectors
+
+    def _inputs_hash(self, collection: str, entity: dict) -> str | None:
         """
-        return {key:
-                self.get_key_embedding(key, *args, **kwargs)
-                for key in self.db.mongo_db['keys'].find(projection={'_id': 1})}
+        Hashes the fields an entity's embedding is computed from, to detect stale cached embeddings.
 
-    def _get_embedding(self, entity_type: str, entity_id: str | int | bytes) -> np.ndarray | None:
+        Args:
+            collection (str): Name of the MongoDB collection.
+            entity (dict): Entity document, with its input fields projected.
+
+        Returns:
+            str | None: The hash, or None for entities whose embedding doesn't depend on other fields.
         """
-        Retrieves embedding for a specific entity from the database.
+        fields = self._EMBEDDING_INPUTS.get(collection)
+        if fields is None:
+            return None
+        inputs = [sorted(value, key=str) if isinstance(value, list) else value
+                  for value in (entity.get(field) for field in fields)]
+        return hashlib.blake2b(json.dumps(inputs, default=str).encode(), digest_size=8).hexdigest()
+
+    def _fetch_entity(self, collection: str, entity_id: str | int | bytes, recompute_fields) -> dict | None:
+        """
+        Fetches an entity's stored embedding together with the fields needed to recompute it, in a single query.
 
         Args:
-            entity_type (str): Type of entity (e.g., 'user', 'post', 'thread').
+            collection (str): Name of the MongoDB collection.
             entity_id (str | int | bytes): Entity ID.
+            recompute_fields (Iterable[str]): Fields the entity's embedding is computed from.
 
         Returns:
-            np.ndarray | None: Retrieved embedding or None if not found.
+            dict | None: The projected entity document, or None if it doesn't exist.
+        """
+        return self.db.mongo_db[collection].find_one(
+            {'_id': entity_id}, {'embedding': 1, **{field: 1 for field in recompute_fields}})
+
+    def _is_fresh(self, collection: str, entity: dict) -> bool:
         """
-        entity = self.db.mongo_db[entity_type].find_one({"_id": entity_id}, {"embedding": 1})
-        return np.array(entity.get("embedding")) if entity else None
+        Tells whether the stored embedding of an entity is fresh and was computed from its current inputs.
 
-    def encode(self, entity_type: str, entity_id: str | int | bytes, show_progress_bar: bool = True, *args, **kwargs) -> np.ndarray:
+        Embeddings of keys and interests only depend on their name, so they stay valid until it changes.
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            entity (dict): Entity document, with its embedding date and hash and its input fields projected.
+
+        Returns:
+            bool: True if the stored embedding can be used as is.
+        """
+        embedding = entity.get('embedding')
+        if not embedding:
+            return False
+        if (collection not in self._CONTENT_EMBEDDINGS
+                and (datetime.now() - datetime.fromisoformat(embedding['date'])) >= self.update_time):
+            return False
+        return embedding.get('hash') == self._inputs_hash(collection, entity)
+
+    def _cached_vector(self, collection: str, entity: dict) -> np.ndarray | None:
+        """
+        Returns the stored embedding of an entity if it is fresh and was computed from its current inputs.
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            entity (dict): Entity document, with its `embedding` and input fields projected.
+
+        Returns:
+            np.ndarray | None: The cached embedding, or None if it must be (re)computed.
+        """
+        if not self._is_fresh(collection, entity):
+            return None
+        return _unpack_vector(entity['embedding']['vector'])
+
+    def _cached_table(self, collection: str, entities) -> EmbeddingTable:
+        """
+        Returns the table of the valid stored embeddings of a collection.
+
+        The table built by the previous call is kept in memory along with the date of each embedding,
+        so only the vectors stored since then are fetched (see `_stored_vectors`) and decoded.
+        When nothing changed, the very same table (and its search index) is returned.
+        The table is updated under `_tables_lock`, so concurrent calls can't overwrite each other's update.
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            entities (Iterable[dict]): All the collection's documents, with their embedding date and hash and
+                their input fields projected (but not the embedding vector).
+
+        Returns:
+            EmbeddingTable: The valid stored embeddings, by entity ID.
+        """
+        valid = {entity['_id']: entity['embedding']['date']
+                 for entity in entities if self._is_fresh(collection, entity)}
+        with self._tables_lock:
+            table, dates = self._tables.get(collection) or (EmbeddingTable.from_dict({}), {})
+            changed = [entity_id for entity_id, date in valid.items() if dates.get(entity_id) != date]
+            vectors = {}
+            if changed:
+                # Decode the vectors straight into one preallocated matrix, streaming the cursor
+                ids, embs = [], None
+                for entity in self._stored_vectors(collection, changed, len(valid)):
+                    vector = _unpack_vector(entity['embedding']['vector'])
+                    if embs is None:
+                        embs = np.empty((len(changed), len(vector)), dtype=np.float32)
+                    embs[len(ids)] = vector
+                    ids.append(entity['_id'])
+                if ids:
+                    vectors = EmbeddingTable(_id_array(ids), embs[:len(ids)])
+            table = table.updated(vectors, keep=valid)
+            self._tables[collection] = (table, valid)
+        return table
+
+    def _stored_vectors(self, collection: str, entity_ids: list, total: int):
+        """
+        Streams the stored embedding vectors of some entities of a collection.
+
+        When most of the collection is requested (e.g. on a cold cache), the whole collection is scanned
+        with a projection; otherwise the IDs are looked up with `$in` queries of `_IN_BATCH_SIZE` IDs each,
+        which keeps every query well below MongoDB's 16 MB document limit.
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            entity_ids (list): IDs of the entities whose vectors to fetch.
+            total (int): Number of entities with an embedding in the collection.
+
+        Yields:
+            dict: Entity documents, with only their `_id` and `embedding.vector` projected.
+        """
+        documents = self.db.mongo_db[collection]
+        projection = {'_id': 1, 'embedding.vector': 1}
+        if 2 * len(entity_ids) >= total:
+            wanted = set(entity_ids)
+            for entity in documents.find({}, projection, batch_size=self._CURSOR_BATCH_SIZE):
+                if entity['_id'] in wanted and entity.get('embedding'):
+                    yield entity
+            return
+        for start in range(0, len(entity_ids), self._IN_BATCH_SIZE):
+            yield from documents.find({'_id': {'$in': entity_ids[start:start + self._IN_BATCH_SIZE]}}, projection,
+                                      batch_size=self._CURSOR_BATCH_SIZE)
+
+    def _extend_table(self, collection: str, vectors: dict, date: str) -> EmbeddingTable:
+        """
+        Adds freshly computed and stored embeddings to the in-memory table of a collection.
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            vectors (dict): A dictionary with entity IDs as keys and their embeddings as values.
+            date (str): The date the embeddings were stored with.
+
+        Returns:
+            EmbeddingTable: The updated table.
+        """
+        with self._tables_lock:
+            table, dates = self._tables[collection]
+            table = table.updated(vectors)
+            self._tables[collection] = (table, {**dates, **dict.fromkeys(vectors, date)})
+        return table
+
+    @staticmethod
+    def _not_in(table: EmbeddingTable, entity_ids) -> list:
+        """Returns the IDs among `entity_ids` that have no row in `table`."""
+        entity_ids = list(entity_ids)
+        if not entity_ids:
+            return []
+        return [entity_id for entity_id, row in zip(entity_ids, table._rows(entity_ids)) if row < 0]
+
+    def _partition_cached(self, collection: str, entities) -> dict:
+        """
+        Collects the valid cached embeddings of a set of entity documents.
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            entities (Iterable[dict]): Entity documents, with their `embedding` and input fields projected.
+
+        Returns:
+            dict: A dictionary with the IDs of entities having a valid embedding as keys and their embeddings as values.
+        """
+        vectors = {}
+        for entity in entities:
+            cached = self._cached_vector(collection, entity)
+            if cached is not None:
+                vectors[entity['_id']] = cached
+        return vectors
+
+    def _encode_batch(self, texts: list[str], batch_size: int = 256) -> np.ndarray:
+        """
+        Encodes a list of texts in a single batched call to the model.
+
+        Args:
+            texts (list[str]): Texts to encode.
+            batch_size (int): Number of texts per forward pass.
+
+        Returns:
+            np.ndarray: Embeddings of shape (len(texts), D).
+        """
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return self.model.encode(texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
+
+    def _store_embeddings(self, collection: str, vectors: dict, entities: dict = None) -> str | None:
+        """
+        Stores freshly computed embeddings in a single bulk write.
+
+        Args:
+            collection (str): Name of the MongoDB collection.
+            vectors (dict): A dictionary with entity IDs as keys and their embeddings (np.ndarray) as values.
+            entities (dict, optional): The entity documents the embeddings were computed from, by ID,
+                used to record the hash of their inputs.
+
+        Returns:
+            str | None: The date the embeddings were stored with, or None if there was nothing to store.
+        """
+        if not vectors:
+            return None
+        date = datetime.now().isoformat()
+        updates = []
+        for entity_id, vector in vectors.items():
+            embedding = {'date': date, 'vector': _pack_vector(vector)}
+            if entities and entity_id in entities:
+                embedding['hash'] = self._inputs_hash(collection, entities[entity_id])
+            updates.append(UpdateOne({'_id': entity_id}, {'$set': {'embedding': embedding}}))
+        with self._db_lock:
+            self.db.mongo_db[collection].bulk_write(updates, ordered=False)
+        return date
+
+    def refresh_embeddings(self) -> None:
+        """
+        Recomputes and stores every missing, expired or stale embedding, collection by collection.
+
+        Meant to be run periodically outside the request path (e.g. from a scheduled job), so that
+        recommendation requests find fresh embeddings in the database and never have to compute them.
+        Collections are refreshed in dependency order: keys and interests, then users, posts and threads.
+        The search index of every table that changed is then rebuilt here rather than on a request.
+        """
+        for collection, refresh in (('keys', self.get_key_embeddings),
+                                    ('interests', self.get_interest_embeddings),
+                                    ('users', self.get_user_embeddings),
+                                    ('posts', self.get_post_embeddings),
+                                    ('threads', self.get_thread_embeddings)):
+            start_time = perf_counter()
+            count = len(refresh())
+            self.logger.info("%d %s embeddings up to date in %.2f seconds", count, collection, perf_counter() - start_time)
+        for table, _ in list(self._tables.values()):
+            table.build_index()
+
+    def start_refresh(self, interval_minutes: float, refresh_now: bool = True) -> Event:
+        """
+        Starts a daemon thread running `refresh_embeddings` every `interval_minutes` minutes, unless it
+        is already running: only the first call starts it, the next ones just return its stop event.
+
+        The interval should be shorter than the embeddings' life duration, so that the tables served by
+        `get_table` never hold expired embeddings for long.
+
+        Args:
+            interval_minutes (float): Minutes between the end of a refresh and the start of the next one.
+            refresh_now (bool): Run the first refresh right away rather than after `interval_minutes`.
+
+        Returns:
+            Event: Set it to stop the thread.
+        """
+        with self._refresh_lock:
+            if self._refresh_stopped is not None:
+                return self._refresh_stopped
+            stopped = self._refresh_stopped = Event()
+
+        def refresh_loop():
+            if not refresh_now and stopped.wait(interval_minutes * 60):
+                return
+            while True:
+                try:
+                    self.refresh_embeddings()
+                except Exception as e:
+                    self.logger.error("Failed to refresh embeddings: %s", str(e), exc_info=True)
+                if stopped.wait(interval_minutes * 60):
+                    return
+
+        Thread(target=refresh_loop, name='embedding-refresh', daemon=True).start()
+        self.logger.info("Refreshing embeddings every %s minutes", interval_minutes)
+        return stopped
+
+    def get_table(self, collection: str) -> EmbeddingTable:
+        """
+        Returns the in-memory table of a collection's embeddings, without computing any embedding.
+
+        The table is the one built by the last bulk call (e.g. by `refresh_embeddings`); on first use,
+        it is loaded from the valid embeddings stored in the database. Entities without one are left out
+        until the next refresh.
+
+        Args:
+            collection (str): Name of the MongoDB collection (keys, interests, users, posts or threads).
+
+        Returns:
+            EmbeddingTable: The collection's embeddings, by entity ID.
+        """
+        loaded = self._tables.get(collection)
+        if loaded is not None:
+            return loaded[0]
+        return self._cached_table(collection, self.db.mongo_db[collection].find(
+            {}, {'_id': 1, 'embedding.date': 1, 'embedding.hash': 1,
+                 **{field: 1 for field in self._EMBEDDING_INPUTS[collection]}}))
+
+    def encode(self, entity_type: str, entity_id: str | int | bytes, show_progress_bar: bool = False, *args, **kwargs) -> np.ndarray:
         """
         Encodes an entity based on type and ID, using specified weights if needed.
 
@@ -974,26 +1693,10 @@ class MC_embedder(watif_integrated_embedder):
         Returns:
             np.ndarray: Encoded embedding.
         """
-        match entity_type.lower():
-            case 'key':
-                return self.get_key_embedding(entity_id, *args, **kwargs)
-            case 'interest':
-                return self.get_interest_embedding(entity_id, *args, **kwargs)
-            case 'user':
-                return self.get_user_embedding(entity_id, *args, **kwargs)
-            case 'post':
-                return self.get_post_embedding(entity_id, *args, **kwargs)
-            case 'thread':
-                return self.get_thread_embedding(entity_id, *args, **kwargs)
-            case 'keys':
-                return self.get_key_embeddings(*args, **kwargs)
-            case 'interests':
-                return self.get_interest_embeddings(*args, **kwargs)
-            case 'users':
-                return self.get_user_embeddings(*args, **kwargs)
-            case 'posts':
-                return self.get_post_embeddings(*args, **kwargs)
-            case 'threads':
-                return self.get_thread_embeddings(*args, **kwargs)
-            case _:
-                return self.model.encode(entity_id, show_progress_bar=show_progress_bar, *args, **kwargs)
+        entity_fn = self._entity_dispatch.get(entity_type) or self._entity_dispatch.get(entity_type.lower())
+        if entity_fn:
+            return entity_fn(entity_id, *args, **kwargs)
+        bulk_fn = self._bulk_dispatch.get(entity_type) or self._bulk_dispatch.get(entity_type.lower())
+        if bulk_fn:
+            return bulk_fn(*args, **kwargs)
+        return self.model.encode(entity_id, show_progress_bar=show_progress_bar, *args, **kwargs)
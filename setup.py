@@ -27,6 +27,12 @@ setup(
     ],
     python_requires=">=3.12",
     install_requires=required,
+    extras_require={
+        "faiss": ["faiss-cpu"],
+        "numba": ["numba"],
+        "onnx": ["optimum[onnxruntime]"],
+        "openvino": ["optimum[openvino]"],
+    },
     entry_points={
         "console_scripts": [
             "recommender=Recommender.__main__:main",
@@ -11,6 +11,7 @@ Example Usage:
     db_test.close_connection()  # Closes the connection to MongoDB
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pymongo import MongoClient
 from pathlib import Path
 import json
@@ -63,22 +64,32 @@ class DatabaseTest:
 
     def insert_data(self, collection_name, data):
         """
-        Inserts multiple documents into a specified collection.
+        Inserts multiple documents into a specified collection, without stopping at the first failing document.
 
         Parameters:
             collection_name (str): The name of the collection to insert data into.
             data (list[dict]): List of documents to insert.
         """
-        self.db[collection_name].insert_many(data)
+        self.db[collection_name].insert_many(data, ordered=False)
+
+    def reset_collection(self, collection_name):
+        """
+        Clears a specified collection and reloads it with its initial data from its JSON file.
+
+        Parameters:
+            collection_name (str): The name of the collection to reset.
+        """
+        data = self.load_json_data(collection_name)
+        self.clear_collection(collection_name)
+        self.insert_data(collection_name, data)
 
     def setup_database(self):
         """
         Sets up the database by clearing and reloading each collection with initial data from JSON files.
+        The collections are reset concurrently, sharing the client's connection pool.
         """
-        for collection_name in self.collections:
-            self.clear_collection(collection_name)
-            data = self.load_json_data(collection_name)
-            self.insert_data(collection_name, data)
+        with ThreadPoolExecutor(max_workers=len(self.collections)) as executor:
+            list(executor.map(self.reset_collection, self.collections))
 
     def teardown_database(self):
         """
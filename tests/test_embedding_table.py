@@ -0,0 +1,42 @@
+"""
+Tests of `EmbeddingTable` lookups with the ID types found in the database: MongoDB ObjectIds for the
+documents' `_id`, and strings or ints for the IDs passed by the API and the references between documents.
+"""
+
+from Recommender.utils.recommender_engine.embedding import EmbeddingTable, _group_means
+from bson import ObjectId
+import numpy as np
+
+USER_ID = ObjectId()
+TABLE = EmbeddingTable.from_dict({
+    USER_ID: np.array([1.0, 0.0], dtype=np.float32),
+    'user': np.array([0.0, 1.0], dtype=np.float32),
+    3: np.array([1.0, 1.0], dtype=np.float32),
+})
+
+
+def test_lookup_keeps_id_types():
+    assert USER_ID in TABLE and 'user' in TABLE and 3 in TABLE
+    assert str(USER_ID) not in TABLE
+    assert '3' not in TABLE
+    np.testing.assert_array_equal(TABLE[3], [1.0, 1.0])
+    assert sorted(map(str, TABLE)) == sorted(['3', 'user', str(USER_ID)])
+
+
+def test_rows_of_mixed_ids():
+    np.testing.assert_array_equal(TABLE._rows([3, str(USER_ID), USER_ID, 'missing', 4]),
+                                  [TABLE._row(3), -1, TABLE._row(USER_ID), -1, -1])
+
+
+def test_group_means_ignore_missing_ids():
+    means = _group_means(TABLE, [[USER_ID, 3], [1, 2], ['user', str(USER_ID)]], 2)
+    np.testing.assert_array_equal(means, [[1.0, 0.5], [0.0, 0.0], [0.0, 1.0]])
+
+
+def test_updated_with_mixed_ids():
+    other = ObjectId()
+    table = TABLE.updated({other: np.array([0.5, 0.5], dtype=np.float32), 3: np.array([2.0, 2.0], dtype=np.float32)},
+                          keep={USER_ID, 3})
+    assert len(table) == 3 and 'user' not in table
+    np.testing.assert_array_equal(table[3], [2.0, 2.0])
+    assert table.search(np.array([1.0, 0.0], dtype=np.float32), 1) == [3]